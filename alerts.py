@@ -0,0 +1,143 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+
+import telegram
+
+logger = logging.getLogger(__name__)
+
+ALERT_WINDOW: int = 3600
+ESCALATION_FACTOR: int = 10
+WINDOW_SLOTS: int = 60
+
+ALERT_TEMPLATES = {
+    'start': 'Новая ошибка: {fingerprint}. Повторов за окно: {count}.',
+    'escalate': (
+        'Ошибка повторяется: {fingerprint}. Повторов за окно: {count}.'
+    ),
+    'clear': 'Ошибка устранена: {fingerprint}. Всего повторов: {total}.'
+}
+
+ADDRESS_PATTERN = re.compile(r'0x[0-9a-fA-F]+')
+NUMBER_PATTERN = re.compile(r'\d+')
+
+
+def fingerprint(error) -> str:
+    """
+    Возвращает отпечаток исключения: класс и шаблон сообщения.
+    Числа в тексте (идентификаторы, временные метки) заменяются
+    на N, чтобы одинаковые сбои разных тенантов склеивались.
+    Адреса объектов (0x7f...) из текста ошибок urllib3 заменяются
+    на 0xN до замены чисел: иначе каждый сбой соединения получает
+    свой отпечаток.
+    Трехзначные коды HTTP сводятся к классу: 500 и 502 дают 5xx,
+    а 401 (неверный токен) остается отдельной ошибкой 4xx.
+    """
+    template = ADDRESS_PATTERN.sub('0xN', str(error))
+    template = NUMBER_PATTERN.sub(_number_template, template)
+    return f'{type(error).__name__}: {template}'
+
+
+def _number_template(match) -> str:
+    number = match.group()
+    if len(number) == 3 and number[0] in '12345':
+        return f'{number[0]}xx'
+    return 'N'
+
+
+class ErrorAggregator:
+    """
+    Агрегирует повторяющиеся ошибки в скользящем окне.
+    Оператору уходит одна сводка, когда ошибка появляется,
+    когда число повторов вырастает в ESCALATION_FACTOR раз
+    и когда ошибка перестает повторяться в течение окна.
+
+    Повторы считаются по WINDOW_SLOTS интервалам окна, а не по одному
+    на каждое появление, поэтому память не зависит от частоты ошибок.
+    """
+
+    def __init__(self, notify, window=ALERT_WINDOW,
+                 escalation_factor=ESCALATION_FACTOR, clock=time.monotonic):
+        self.notify = notify
+        self.window = window
+        self.escalation_factor = escalation_factor
+        self.clock = clock
+        self.slot = window / WINDOW_SLOTS
+        self.events = {}
+        self.counts = {}
+        self.totals = {}
+        self.thresholds = {}
+        self.lock = threading.Lock()
+
+    def register(self, error) -> None:
+        """Учитывает очередное появление ошибки."""
+        key = fingerprint(error)
+        with self.lock:
+            now = self.clock()
+            slot = int(now // self.slot)
+            events = self.events.setdefault(key, deque())
+            if events and events[-1][0] == slot:
+                events[-1][1] += 1
+            else:
+                events.append([slot, 1])
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self._expire(key, now)
+            self.totals[key] = self.totals.get(key, 0) + 1
+            count = self.counts[key]
+            if key not in self.thresholds:
+                self.thresholds[key] = self.escalation_factor
+                kind = 'start'
+            elif count >= self.thresholds[key]:
+                self.thresholds[key] *= self.escalation_factor
+                kind = 'escalate'
+            else:
+                return
+        self._alert(kind, key, count)
+
+    def flush(self) -> None:
+        """Закрывает ошибки, которые не повторялись в течение окна."""
+        cleared = []
+        with self.lock:
+            now = self.clock()
+            for key in list(self.events):
+                self._expire(key, now)
+                if self.events[key]:
+                    continue
+                cleared.append((key, self.totals.pop(key)))
+                del self.events[key]
+                del self.counts[key]
+                del self.thresholds[key]
+        for key, total in cleared:
+            self._alert('clear', key, 0, total)
+
+    def active(self) -> dict:
+        """Возвращает число повторов в окне для каждой активной ошибки."""
+        with self.lock:
+            return dict(self.counts)
+
+    def _expire(self, key, now) -> None:
+        events = self.events[key]
+        while events and now - (events[0][0] + 1) * self.slot > self.window:
+            self.counts[key] -= events.popleft()[1]
+
+    def _alert(self, kind, key, count, total=0) -> None:
+        text = ALERT_TEMPLATES[kind].format(
+            fingerprint=key, count=count, total=total
+        )
+        try:
+            self.notify(text)
+        except Exception as error:
+            logger.error(f'Не удалось отправить оповещение: {error}')
+
+
+def telegram_notifier(bot, chat_id):
+    """Возвращает функцию отправки оповещений в чат оператора."""
+    def notify(text):
+        """notify."""
+        try:
+            bot.send_message(chat_id=chat_id, text=text)
+        except telegram.TelegramError as error:
+            logger.error(f'Оповещение не отправлено. {error}')
+    return notify
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY_MIN: int = 1
+LATENCY_TOLERANCE: float = 2.0
+LATENCY_SMOOTHING: float = 0.2
+BASELINE_DRIFT: float = 0.001
+DROP_BACKOFF: float = 0.5
+LATENCY_BACKOFF: float = 0.9
+
+
+class AdaptiveLimit:
+    """
+    Адаптивный предел одновременных вызовов одного внешнего сервиса.
+    Предел растет на единицу за каждые limit успешных вызовов
+    (аддитивный рост), пока сглаженная задержка не превышает базовую
+    больше чем в LATENCY_TOLERANCE раз. Рост задержки уменьшает предел
+    в LATENCY_BACKOFF раз, ошибка перегрузки — в DROP_BACKOFF раз
+    (мультипликативное снижение). Вызовы, начатые до последнего
+    снижения, предел больше не снижают, чтобы одна волна ошибок
+    не обнулила его.
+
+    Базовая задержка — минимум наблюдаемых задержек, медленно
+    подтягиваемый вверх, чтобы предел пережил смену сети.
+    """
+
+    def __init__(self, name, initial, max_limit, min_limit=CONCURRENCY_MIN,
+                 tolerance=LATENCY_TOLERANCE, clock=time.monotonic):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.clock = clock
+        self.inflight = 0
+        self.baseline = None
+        self.smoothed = None
+        self.decreased_at = float('-inf')
+        self.drops = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """Ждет свободного места под пределом; возвращает момент начала."""
+        with self.condition:
+            while self.inflight >= int(self.limit):
+                self.condition.wait()
+            self.inflight += 1
+        return self.clock()
+
+    def release(self, started, dropped=False, sample=True) -> None:
+        """
+        Освобождает место и пересчитывает предел.
+        dropped — вызов закончился ошибкой перегрузки,
+        sample=False — исход вызова ничего не говорит о сервисе.
+        """
+        latency = self.clock() - started
+        with self.condition:
+            utilized = self.inflight * 2 >= int(self.limit)
+            self.inflight -= 1
+            if dropped:
+                self.drops += 1
+                self._decrease(started, DROP_BACKOFF)
+            elif sample:
+                self._observe(started, latency, utilized)
+            self.condition.notify_all()
+
+    def _observe(self, started, latency, utilized) -> None:
+        if self.baseline is None:
+            self.baseline = self.smoothed = latency
+        self.baseline = min(
+            latency, self.baseline + (latency - self.baseline) * BASELINE_DRIFT
+        )
+        self.smoothed += (latency - self.smoothed) * LATENCY_SMOOTHING
+        if self.smoothed > self.baseline * self.tolerance:
+            self._decrease(started, LATENCY_BACKOFF)
+        elif utilized:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self, started, factor) -> None:
+        if started < self.decreased_at:
+            return
+        self.decreased_at = self.clock()
+        limit = max(self.min_limit, self.limit * factor)
+        if int(limit) != int(self.limit):
+            logger.debug(
+                f'Предел параллельности {self.name}: '
+                f'{int(self.limit)} -> {int(limit)}'
+            )
+        self.limit = limit
+
+    def snapshot(self) -> dict:
+        """Возвращает текущий предел и задержки для метрик."""
+        with self.condition:
+            return {
+                'concurrency_limit': int(self.limit),
+                'concurrency_inflight': self.inflight,
+                'latency_baseline_seconds': _rounded(self.baseline),
+                'latency_smoothed_seconds': _rounded(self.smoothed),
+                'overload_drops': self.drops,
+            }
+
+
+def _rounded(value):
+    return None if value is None else round(value, 3)
+
+
+def bounded(handler, limit, overload=(), is_overload=None):
+    """
+    Оборачивает обработчик стадии конвейера адаптивным пределом.
+    Исключения из overload считаются признаком перегрузки сервиса;
+    is_overload, если задан, уточняет это для каждого исключения.
+    Остальные ошибки предел не меняют.
+    """
+    def inner(item):
+        """inner."""
+        started = limit.acquire()
+        try:
+            result = handler(item)
+        except overload as error:
+            if is_overload is None or is_overload(error):
+                limit.release(started, dropped=True)
+            else:
+                limit.release(started, sample=False)
+            raise
+        except Exception:
+            limit.release(started, sample=False)
+            raise
+        limit.release(started)
+        return result
+    return inner
@@ -0,0 +1,150 @@
+import logging
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+
+import requests
+import telegram
+
+import homework
+from ratelimit import INTERACTIVE
+from tenants import headers_of
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_WORKERS: int = 32
+PROBE_TIMEOUT: int = 10
+
+OK = 'ok'
+INVALID = 'invalid'
+UNKNOWN = 'unknown'
+
+Probe = namedtuple('Probe', ('state', 'reason'))
+TenantCheck = namedtuple('TenantCheck', ('tenant', 'state', 'reasons'))
+
+PROBE_OK = Probe(OK, None)
+
+
+class CredentialReport:
+    """
+    Итог проверки учетных данных всех тенантов.
+    Тенанты с заведомо неверными токенами или чатами попадают
+    в карантин; при временных сбоях проверки тенант остается в работе.
+    """
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    @property
+    def valid(self) -> list:
+        """Тенанты, которых можно опрашивать."""
+        return [
+            check.tenant for check in self.checks if check.state != INVALID
+        ]
+
+    @property
+    def quarantined(self) -> list:
+        """Проверки тенантов, отправленных в карантин."""
+        return [check for check in self.checks if check.state == INVALID]
+
+    def summary(self) -> dict:
+        """Возвращает число тенантов в каждом состоянии."""
+        return dict(Counter(check.state for check in self.checks))
+
+
+def probe_practicum(token, limiter=None) -> Probe:
+    """
+    Проверяет токен Практикума пробным запросом к API.
+    Запрос проходит через limiter вне очереди фоновых опросов,
+    но в пределах тех же корзин токенов.
+    """
+    if limiter is not None:
+        limiter.acquire(token, INTERACTIVE)
+    try:
+        response = requests.get(
+            homework.ENDPOINT,
+            headers=headers_of(token),
+            params={'from_date': int(time.time())},
+            timeout=PROBE_TIMEOUT
+        )
+    except requests.RequestException as error:
+        return Probe(UNKNOWN, f'API Практикума недоступен: {error}')
+    if response.status_code == HTTPStatus.OK:
+        return PROBE_OK
+    if response.status_code in (
+        HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+    ):
+        return Probe(INVALID, 'Токен Практикума отклонен')
+    return Probe(
+        UNKNOWN, f'API Практикума вернул код {response.status_code}'
+    )
+
+
+def probe_bot(token) -> Probe:
+    """Проверяет токен бота вызовом getMe."""
+    try:
+        telegram.Bot(token=token).get_me(timeout=PROBE_TIMEOUT)
+    except (telegram.error.InvalidToken, telegram.error.Unauthorized):
+        return Probe(INVALID, 'Токен бота отклонен')
+    except telegram.TelegramError as error:
+        return Probe(UNKNOWN, f'Telegram недоступен: {error}')
+    return PROBE_OK
+
+
+def probe_chat(pair) -> Probe:
+    """Проверяет, что бот видит чат, вызовом getChat."""
+    token, chat_id = pair
+    try:
+        telegram.Bot(token=token).get_chat(chat_id, timeout=PROBE_TIMEOUT)
+    except (telegram.error.BadRequest, telegram.error.Unauthorized):
+        return Probe(INVALID, f'Чат {chat_id} недоступен боту')
+    except telegram.TelegramError as error:
+        return Probe(UNKNOWN, f'Telegram недоступен: {error}')
+    return PROBE_OK
+
+
+def validate_tenants(tenants, max_workers=VALIDATION_WORKERS, limiter=None):
+    """
+    Параллельно проверяет учетные данные всех тенантов.
+    Одинаковые токены и чаты проверяются один раз, число
+    одновременных запросов ограничено max_workers, а запросы
+    к API Практикума — ограничителем limiter.
+    """
+    tenants = list(tenants)
+    practicum_tokens = list({tenant.practicum_token for tenant in tenants})
+    bot_tokens = list({tenant.telegram_token for tenant in tenants})
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        practicum = executor.map(
+            partial(probe_practicum, limiter=limiter), practicum_tokens
+        )
+        bots = executor.map(probe_bot, bot_tokens)
+        practicum = dict(zip(practicum_tokens, practicum))
+        bots = dict(zip(bot_tokens, bots))
+        chats = list({
+            (tenant.telegram_token, tenant.chat_id) for tenant in tenants
+            if bots[tenant.telegram_token].state == OK
+        })
+        chats = dict(zip(chats, executor.map(probe_chat, chats)))
+    checks = []
+    for tenant in tenants:
+        probes = [
+            practicum[tenant.practicum_token],
+            bots[tenant.telegram_token],
+            chats.get((tenant.telegram_token, tenant.chat_id), PROBE_OK),
+        ]
+        states = {probe.state for probe in probes}
+        state = INVALID if INVALID in states else (
+            UNKNOWN if UNKNOWN in states else OK
+        )
+        reasons = [probe.reason for probe in probes if probe.reason]
+        checks.append(TenantCheck(tenant, state, reasons))
+    report = CredentialReport(checks)
+    for check in report.quarantined:
+        logger.error(
+            f'Тенант {check.tenant.name} в карантине: '
+            f'{"; ".join(check.reasons)}'
+        )
+    logger.info(f'Проверка учетных данных: {report.summary()}')
+    return report
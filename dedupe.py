@@ -0,0 +1,146 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+DEDUPE_MAX_BYTES: int = 1024 * 1024
+# Оценка сверху для одной записи: узел OrderedDict, ключ-дайджест
+# на 16 байт и кортеж (дайджест значения, срок годности).
+ENTRY_SIZE: int = 320
+BLOOM_HASHES: int = 4
+BLOOM_BITS_PER_KEY: int = 10
+
+
+def digest(value, size=16) -> bytes:
+    """Возвращает дайджест фиксированной длины для произвольной строки."""
+    return hashlib.blake2b(str(value).encode(), digest_size=size).digest()
+
+
+class BloomFilter:
+    """
+    Вероятностный фильтр для ключей, которых точно не было.
+    Ложноотрицательных ответов нет, ложноположительные возможны.
+    """
+
+    def __init__(self, capacity):
+        self.size = max(8, capacity * BLOOM_BITS_PER_KEY)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, key) -> None:
+        """Добавляет дайджест ключа в фильтр."""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def _positions(self, key):
+        first = int.from_bytes(key[:8], 'little')
+        second = int.from_bytes(key[8:], 'little') | 1
+        return [
+            (first + number * second) % self.size
+            for number in range(BLOOM_HASHES)
+        ]
+
+
+class DedupeCache:
+    """
+    Ограниченный по памяти кэш последних значений для дедупликации.
+    Ключи и значения хранятся как дайджесты фиксированной длины,
+    поэтому объем памяти не превышает capacity * ENTRY_SIZE.
+    Вытеснение — по давности использования (LRU) и по сроку жизни (TTL).
+    """
+
+    def __init__(self, max_bytes=DEDUPE_MAX_BYTES, ttl=None, bloom=False,
+                 clock=time.monotonic):
+        self.capacity = max(1, max_bytes // ENTRY_SIZE)
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.bloom = BloomFilter(self.capacity) if bloom else None
+        self.lock = threading.Lock()
+        self.counters = {
+            'hits': 0, 'misses': 0, 'evictions': 0,
+            'expirations': 0, 'bloom_skips': 0
+        }
+
+    def is_new(self, key, value) -> bool:
+        """
+        Проверяет, отличается ли значение от запомненного для ключа.
+        Новое значение запоминается.
+        """
+        key = digest(key)
+        value = digest(value, 8)
+        with self.lock:
+            stored = self._lookup(key)
+            if stored == value:
+                self.counters['hits'] += 1
+                return False
+            self.counters['misses'] += 1
+            self._store(key, value)
+            return True
+
+    def release(self, key, value) -> None:
+        """
+        Забывает значение, запомненное is_new, если с тех пор
+        оно не менялось: следующий is_new с ним снова вернет True.
+        """
+        key = digest(key)
+        value = digest(value, 8)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == value:
+                del self.entries[key]
+
+    def forget(self, key) -> None:
+        """Удаляет ключ из кэша."""
+        with self.lock:
+            self.entries.pop(digest(key), None)
+
+    def stats(self) -> dict:
+        """Возвращает счетчики попаданий, промахов и вытеснений."""
+        with self.lock:
+            stats = dict(self.counters)
+            stats['size'] = len(self.entries)
+        stats['capacity'] = self.capacity
+        stats['max_bytes'] = self.capacity * ENTRY_SIZE
+        return stats
+
+    def _lookup(self, key):
+        if self.bloom is not None and key not in self.bloom:
+            self.counters['bloom_skips'] += 1
+            return None
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= self.clock():
+            del self.entries[key]
+            self.counters['expirations'] += 1
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value) -> None:
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        self.entries[key] = (value, expires)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.counters['evictions'] += 1
+        if self.bloom is None:
+            return
+        if self.bloom.count >= self.capacity * 2:
+            self._rebuild_bloom()
+        else:
+            self.bloom.add(key)
+
+    def _rebuild_bloom(self) -> None:
+        self.bloom = BloomFilter(self.capacity)
+        for key in self.entries:
+            self.bloom.add(key)
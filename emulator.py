@@ -0,0 +1,391 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from polling import DATE_FORMAT
+
+API_PATH: str = '/api/user_api/homework_statuses/'
+TOKEN_PREFIX: str = 'token-'
+TOKENS: int = 10_000
+HISTORY_DAYS: int = 30
+REVIEW_WAIT: float = 8 * 3600
+REVIEW_TIME: float = 3600
+RESUBMIT_WAIT: float = 24 * 3600
+APPROVE_PROBABILITY: float = 0.6
+MAX_ATTEMPTS: int = 4
+MAX_HEADER_BYTES: int = 16 * 1024
+
+REASONS = {status.value: status.phrase for status in HTTPStatus}
+NOT_AUTHENTICATED = json.dumps({
+    'code': 'not_authenticated',
+    'message': 'Учетные данные не были предоставлены.',
+    'source': '__response__',
+}, ensure_ascii=False).encode()
+WRONG_FROM_DATE = json.dumps({
+    'error': {'error': 'Wrong from_date format'},
+    'code': 'UnknownError',
+}).encode()
+NOT_FOUND = b'{"detail": "Not found."}'
+THROTTLED = b'{"detail": "Request was throttled."}'
+INJECTED_ERROR = b'{"detail": "Injected error."}'
+METHOD_NOT_ALLOWED = b'{"detail": "Method not allowed."}'
+
+
+def format_date(timestamp) -> str:
+    """Форматирует unix time как date_updated API Практикума."""
+    return time.strftime(DATE_FORMAT, time.gmtime(timestamp))
+
+
+class Timelines:
+    """
+    Истории смен статусов работ для множества токенов.
+    История токена детерминированно выводится из самого токена
+    и момента epoch, поэтому процессы эмулятора с общим epoch
+    отвечают одинаково без общего состояния. Работа попадает
+    в reviewing после ожидания ревьюера, затем в approved или
+    rejected; отклоненная работа отправляется повторно.
+    """
+
+    def __init__(self, epoch, tokens=TOKENS, prefix=TOKEN_PREFIX):
+        self.epoch = epoch
+        self.tokens = tokens
+        self.prefix = prefix
+        self.cache = {}
+
+    def known(self, token) -> bool:
+        """Токен выдан эмулятором."""
+        if not token.startswith(self.prefix):
+            return False
+        number = token[len(self.prefix):]
+        return number.isdigit() and int(number) < self.tokens
+
+    def history(self, token) -> list:
+        """
+        Возвращает события токена (время, индекс работы, JSON работы
+        в новом статусе), отсортированные по времени. JSON готовится
+        один раз, чтобы ответ собирался без сериализации.
+        """
+        events = self.cache.get(token)
+        if events is None:
+            events = self.cache[token] = self._generate(token)
+        return events
+
+    def _generate(self, token):
+        rng = random.Random(zlib.crc32(token.encode()))
+        events = []
+        for index in range(rng.randint(1, 5)):
+            moment = self.epoch - rng.uniform(0, HISTORY_DAYS * 86400)
+            moment += rng.uniform(0, 2 * HISTORY_DAYS * 86400) * index / 5
+            for attempt in range(MAX_ATTEMPTS):
+                moment += _lognormal(rng, REVIEW_WAIT)
+                events.append((moment, index, 'reviewing'))
+                moment += _lognormal(rng, REVIEW_TIME)
+                approved = (
+                    attempt == MAX_ATTEMPTS - 1
+                    or rng.random() < APPROVE_PROBABILITY
+                )
+                events.append(
+                    (moment, index, 'approved' if approved else 'rejected')
+                )
+                if approved:
+                    break
+                moment += _lognormal(rng, RESUBMIT_WAIT)
+        events.sort()
+        return [
+            (moment, index, json.dumps({
+                'id': zlib.crc32(f'{token}/{index}'.encode()),
+                'status': status,
+                'homework_name': f'{token}__project_{index}.zip',
+                'reviewer_comment': '',
+                'date_updated': format_date(moment),
+                'lesson_name': f'Проект {index}',
+            }, ensure_ascii=False).encode())
+            for moment, index, status in events
+        ]
+
+    def homeworks(self, token, from_date, now) -> list:
+        """
+        Возвращает JSON работ токена, обновленных с from_date до now,
+        в текущем статусе, начиная с самой свежей.
+        """
+        latest = {}
+        for moment, index, homework in self.history(token):
+            if moment > now:
+                break
+            latest[index] = (moment, homework)
+        return [
+            homework for moment, homework in sorted(
+                latest.values(), key=lambda item: item[0], reverse=True
+            )
+            if moment >= from_date
+        ]
+
+
+def _lognormal(rng, median):
+    return rng.lognormvariate(math.log(median), 0.8)
+
+
+class Throttle:
+    """Корзина запросов на каждый токен; None — без ограничения."""
+
+    def __init__(self, rate=None, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst or rate
+        self.clock = clock
+        self.buckets = {}
+
+    def allow(self, token) -> bool:
+        """Списывает запрос токена, если корзина не пуста."""
+        if self.rate is None:
+            return True
+        now = self.clock()
+        tokens, updated = self.buckets.get(token, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self.buckets[token] = (tokens, now)
+            return False
+        self.buckets[token] = (tokens - 1, now)
+        return True
+
+
+class Emulator:
+    """
+    Эмулятор эндпоинта homework_statuses.
+    speed ускоряет время истории относительно настоящего:
+    при speed=3600 час истории проходит за секунду.
+    """
+
+    def __init__(self, timelines, speed=1.0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=HTTPStatus.INTERNAL_SERVER_ERROR,
+                 throttle=None, clock=time.time):
+        self.timelines = timelines
+        self.speed = speed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle = throttle if throttle is not None else Throttle()
+        self.clock = clock
+        self.started = clock()
+        self.rng = random.Random()
+
+    def now(self) -> float:
+        """Текущее время истории."""
+        elapsed = self.clock() - self.started
+        return self.timelines.epoch + elapsed * self.speed
+
+    def delay(self) -> float:
+        """Задержка очередного ответа в секундах."""
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.rng.gauss(self.latency, self.jitter))
+
+    def handle(self, path, authorization) -> tuple:
+        """Возвращает код и JSON-тело ответа на GET path."""
+        url = urlsplit(path)
+        if url.path != API_PATH:
+            return HTTPStatus.NOT_FOUND, NOT_FOUND
+        scheme, _, token = (authorization or '').partition(' ')
+        if scheme != 'OAuth' or not self.timelines.known(token):
+            return HTTPStatus.UNAUTHORIZED, NOT_AUTHENTICATED
+        if not self.throttle.allow(token):
+            return HTTPStatus.TOO_MANY_REQUESTS, THROTTLED
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.error_status, INJECTED_ERROR
+        try:
+            from_date = int(parse_qs(url.query).get('from_date', ['0'])[0])
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, WRONG_FROM_DATE
+        now = self.now()
+        homeworks = self.timelines.homeworks(token, from_date, now)
+        return HTTPStatus.OK, b'{"homeworks": [%s], "current_date": %d}' % (
+            b', '.join(homeworks), now
+        )
+
+
+def render(status, payload, keep_alive) -> bytes:
+    """Собирает ответ HTTP/1.1."""
+    head = (
+        f'HTTP/1.1 {int(status)} {REASONS.get(int(status), "")}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(payload)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+    )
+    return head.encode() + payload
+
+
+class HttpProtocol(asyncio.Protocol):
+    """
+    Минимальный HTTP/1.1: keep-alive и конвейерные запросы.
+    Ответы уходят в порядке запросов, даже если задержка
+    у более раннего ответа больше.
+    """
+
+    def __init__(self, emulator):
+        self.emulator = emulator
+        self.buffer = b''
+        self.pending = deque()
+        self.transport = None
+        self.closing = False
+
+    def connection_made(self, transport):
+        """Запоминает соединение."""
+        self.transport = transport
+
+    def data_received(self, data):
+        """Разбирает все полные запросы из буфера."""
+        self.buffer += data
+        while not self.closing:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self.buffer) > MAX_HEADER_BYTES:
+                    self.transport.close()
+                return
+            head = self.buffer[:end].decode('latin-1').split('\r\n')
+            self.buffer = self.buffer[end + 4:]
+            self._request(head)
+
+    def _request(self, head):
+        method, path, version = (head[0].split(' ') + ['', ''])[:3]
+        headers = {}
+        for line in head[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length') or 0)
+        self.buffer = self.buffer[length:]
+        connection = headers.get('connection', '').lower()
+        keep_alive = (
+            connection != 'close'
+            and (version == 'HTTP/1.1' or connection == 'keep-alive')
+        )
+        if method != 'GET':
+            status, body = HTTPStatus.METHOD_NOT_ALLOWED, METHOD_NOT_ALLOWED
+        else:
+            status, body = self.emulator.handle(
+                path, headers.get('authorization')
+            )
+        slot = [render(status, body, keep_alive), keep_alive, False]
+        self.pending.append(slot)
+        self.closing = not keep_alive
+        delay = self.emulator.delay()
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready, slot)
+        else:
+            self._ready(slot)
+
+    def _ready(self, slot):
+        slot[2] = True
+        while self.pending and self.pending[0][2]:
+            payload, keep_alive, _ = self.pending.popleft()
+            if self.transport.is_closing():
+                return
+            self.transport.write(payload)
+            if not keep_alive:
+                self.transport.close()
+
+
+async def _serve(emulator, host, port, reuse_port, ready=None):
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(
+        lambda: HttpProtocol(emulator), host, port,
+        reuse_port=reuse_port, backlog=4096
+    )
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(emulator, port, host='127.0.0.1'):
+    """
+    Запускает эмулятор в фоновом потоке.
+    Возвращает (порт, функция остановки).
+    """
+    started = threading.Event()
+    state = {}
+
+    def ready(server):
+        state['server'] = server
+        state['loop'] = asyncio.get_running_loop()
+        started.set()
+
+    def run():
+        try:
+            asyncio.run(_serve(emulator, host, port, False, ready))
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, name='emulator', daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        state['loop'].call_soon_threadsafe(state['server'].close)
+        thread.join()
+
+    return state['server'].sockets[0].getsockname()[1], stop
+
+
+def _worker(arguments, epoch):
+    emulator = Emulator(
+        Timelines(epoch, arguments.tokens, arguments.prefix),
+        speed=arguments.speed, latency=arguments.latency,
+        jitter=arguments.jitter, error_rate=arguments.error_rate,
+        error_status=arguments.error_status,
+        throttle=Throttle(arguments.rate, arguments.burst)
+    )
+    asyncio.run(_serve(
+        emulator, arguments.host, arguments.port, arguments.processes > 1
+    ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Локальный эмулятор API статусов домашних работ.'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument(
+        '--processes', type=int, default=1,
+        help='число процессов на одном порту (SO_REUSEPORT)'
+    )
+    parser.add_argument('--tokens', type=int, default=TOKENS)
+    parser.add_argument('--prefix', default=TOKEN_PREFIX)
+    parser.add_argument(
+        '--speed', type=float, default=1.0,
+        help='во сколько раз время истории идет быстрее настоящего'
+    )
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='средняя задержка ответа, с')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='стандартное отклонение задержки, с')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int,
+                        default=HTTPStatus.INTERNAL_SERVER_ERROR)
+    parser.add_argument('--rate', type=float,
+                        help='запросов в секунду на токен (в процессе)')
+    parser.add_argument('--burst', type=float)
+    arguments = parser.parse_args()
+    epoch = time.time()
+    workers = [
+        multiprocessing.Process(target=_worker, args=(arguments, epoch))
+        for _ in range(arguments.processes - 1)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        _worker(arguments, epoch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
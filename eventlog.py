@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from polling import parse_date
+
+COLUMNS = {
+    'ts': np.dtype('<i8'),
+    'tenant': np.dtype('<u4'),
+    'homework': np.dtype('<u8'),
+    'status': np.dtype('u1'),
+}
+STATUS_CODES = {'reviewing': 1, 'approved': 2, 'rejected': 3}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+PERCENTILES = (50, 90, 99)
+
+
+def tenant_key(tenant) -> int:
+    """Возвращает числовой ключ тенанта для колонки tenant."""
+    return zlib.crc32(str(tenant).encode())
+
+
+def homework_key(tenant, name) -> int:
+    """Возвращает 64-битный ключ работы тенанта для колонки homework."""
+    digest = hashlib.blake2b(
+        f'{tenant}/{name}'.encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class EventLog:
+    """
+    Журнал смен статусов в колоночном формате.
+    Каждая колонка — отдельный файл с массивом фиксированной ширины,
+    записи только дописываются в конец. Для анализа файлы отображаются
+    в память через np.memmap без создания объектов Python на событие.
+    Колонка ts — unix time date_updated (UTC); перевод в местное
+    время делает только анализ через utc_offset.
+
+    При открытии недописанный хвост колонок обрезается до последней
+    полной строки, а последние статусы работ читаются из журнала,
+    чтобы после перезапуска не записать тот же статус повторно.
+    """
+
+    def __init__(self, path, tenant='default', clock=time.time):
+        self.path = path
+        self.tenant = tenant
+        self.clock = clock
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        rows = min(column_rows(path).values())
+        for name, dtype in COLUMNS.items():
+            column_path = self._column_path(name)
+            if os.path.exists(column_path):
+                os.truncate(column_path, rows * dtype.itemsize)
+        self.last = last_statuses(load_columns(path))
+        self.files = {
+            name: open(self._column_path(name), 'ab')
+            for name in COLUMNS
+        }
+
+    def append(self, ts, tenant, homework, status) -> None:
+        """Дописывает пачку событий; аргументы — массивы одной длины."""
+        values = {
+            'ts': ts, 'tenant': tenant, 'homework': homework, 'status': status
+        }
+        with self.lock:
+            for name, dtype in COLUMNS.items():
+                self.files[name].write(
+                    np.asarray(values[name], dtype=dtype).tobytes()
+                )
+            for file in self.files.values():
+                file.flush()
+
+    def observe(self, homework, tenant=None) -> None:
+        """Записывает событие, если статус работы изменился."""
+        tenant = self.tenant if tenant is None else tenant
+        key = homework_key(tenant, homework.get('homework_name'))
+        status = STATUS_CODES.get(homework.get('status'), 0)
+        with self.lock:
+            if self.last.get(key) == status:
+                return
+            self.last[key] = status
+        changed = parse_date(homework.get('date_updated'), self.clock())
+        self.append([int(changed)], [tenant_key(tenant)], [key], [status])
+
+    def close(self) -> None:
+        """Закрывает файлы колонок."""
+        with self.lock:
+            for file in self.files.values():
+                file.close()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f'{name}.col')
+
+
+def column_rows(path) -> dict:
+    """Возвращает число полных строк в каждой колонке журнала."""
+    sizes = {}
+    for name, dtype in COLUMNS.items():
+        column_path = os.path.join(path, f'{name}.col')
+        size = os.path.getsize(column_path) if os.path.exists(
+            column_path
+        ) else 0
+        sizes[name] = size // dtype.itemsize
+    return sizes
+
+
+def load_columns(path) -> dict:
+    """
+    Отображает колонки журнала в память только для чтения.
+    Недописанный хвост (после сбоя посреди записи) отбрасывается.
+    """
+    rows = min(column_rows(path).values())
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+            continue
+        columns[name] = np.memmap(
+            os.path.join(path, f'{name}.col'),
+            dtype=dtype, mode='r', shape=(rows,)
+        )
+    return columns
+
+
+def last_statuses(columns) -> dict:
+    """Возвращает последний записанный статус каждой работы."""
+    homework = columns['homework'][::-1]
+    keys, index = np.unique(homework, return_index=True)
+    return dict(zip(
+        keys.tolist(), columns['status'][::-1][index].tolist()
+    ))
+
+
+def transitions(columns) -> dict:
+    """
+    Строит переходы между соседними событиями одной работы.
+    Возвращает массивы from, to, start, dwell (время в статусе from).
+    """
+    order = np.lexsort((columns['ts'], columns['homework']))
+    homework = columns['homework'][order]
+    ts = columns['ts'][order]
+    status = columns['status'][order]
+    same = homework[1:] == homework[:-1]
+    return {
+        'from': status[:-1][same],
+        'to': status[1:][same],
+        'start': ts[:-1][same],
+        'dwell': (ts[1:] - ts[:-1])[same],
+    }
+
+
+def transition_percentiles(columns, source, target, since=None,
+                           percentiles=PERCENTILES) -> dict:
+    """Возвращает перцентили времени перехода source -> target."""
+    moves = transitions(columns)
+    mask = (
+        (moves['from'] == STATUS_CODES[source])
+        & (moves['to'] == STATUS_CODES[target])
+    )
+    if since is not None:
+        mask &= moves['start'] >= since
+    return _percentiles(moves['dwell'][mask], percentiles)
+
+
+def dwell_by_status(columns, since=None, percentiles=PERCENTILES) -> dict:
+    """Возвращает перцентили времени пребывания в каждом статусе."""
+    moves = transitions(columns)
+    mask = np.ones(len(moves['dwell']), dtype=bool)
+    if since is not None:
+        mask &= moves['start'] >= since
+    return {
+        name: _percentiles(
+            moves['dwell'][mask & (moves['from'] == code)], percentiles
+        )
+        for name, code in STATUS_CODES.items()
+    }
+
+
+def throughput_by_hour(columns, status=None, since=None, utc_offset=0):
+    """Возвращает число событий по часам суток (массив из 24 значений)."""
+    mask = np.ones(len(columns['ts']), dtype=bool)
+    if status is not None:
+        mask &= columns['status'] == STATUS_CODES[status]
+    if since is not None:
+        mask &= columns['ts'] >= since
+    hours = ((columns['ts'][mask] + utc_offset) // 3600) % 24
+    return np.bincount(hours, minlength=24)
+
+
+def _percentiles(values, percentiles) -> dict:
+    if len(values) == 0:
+        return {'count': 0}
+    result = dict(zip(
+        (f'p{value}' for value in percentiles),
+        np.percentile(values, percentiles).tolist()
+    ))
+    result['count'] = int(len(values))
+    return result
+
+
+def report(path, days=None, utc_offset=0) -> str:
+    """Готовит текстовый отчет по журналу событий."""
+    columns = load_columns(path)
+    since = None if days is None else int(time.time() - days * 86400)
+    lines = [f'Событий: {len(columns["ts"])}']
+    for source, target in (
+        ('reviewing', 'approved'), ('reviewing', 'rejected')
+    ):
+        stats = transition_percentiles(columns, source, target, since)
+        lines.append(f'{source} -> {target}: {_format(stats)}')
+    for name, stats in dwell_by_status(columns, since).items():
+        lines.append(f'В статусе {name}: {_format(stats)}')
+    hours = throughput_by_hour(columns, since=since, utc_offset=utc_offset)
+    lines.append('По часам: ' + ' '.join(
+        f'{hour:02d}:{count}' for hour, count in enumerate(hours.tolist())
+    ))
+    return '\n'.join(lines)
+
+
+def _format(stats) -> str:
+    return ', '.join(
+        f'{key}={value:.0f}' if key != 'count' else f'{key}={value}'
+        for key, value in stats.items()
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Аналитика журнала смен статусов.'
+    )
+    parser.add_argument('path', help='каталог журнала событий')
+    parser.add_argument('--days', type=float, help='только последние N дней')
+    parser.add_argument(
+        '--utc-offset', type=int, default=0,
+        help='смещение часового пояса в секундах для разбивки по часам'
+    )
+    arguments = parser.parse_args()
+    print(report(arguments.path, arguments.days, arguments.utc_offset))
@@ -1,7 +1,9 @@
 class StatusCodeError(Exception):
     """Исключение, если вернувшийся статус не 200."""
 
-    pass
+    def __init__(self, message='', status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class UnknownStatusHomeWork(Exception):
@@ -0,0 +1,359 @@
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from http import HTTPStatus
+
+import requests
+import telegram
+
+import homework
+from soak import StopSoak, patch_loop
+
+CHANGE_EVERY: int = 1800
+STALL_SECONDS: int = 300
+RETRY_AFTER: int = 30
+HOMEWORK_NAME: str = 'faults.zip'
+
+PRACTICUM_FAULTS = ('reset', 'status', 'truncated', 'malformed', 'stall')
+TELEGRAM_FAULTS = ('flood', 'timeout', 'reset')
+
+ScenarioResult = namedtuple(
+    'ScenarioResult',
+    ('name', 'recovery', 'delays', 'lost', 'faults', 'errors')
+)
+
+
+class VirtualClock:
+    """
+    Виртуальное время прогона.
+    Задержки и паузы цикла сдвигают часы вместо настоящего ожидания,
+    поэтому часы сценария проходят за доли секунды.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds) -> None:
+        """Сдвигает часы на seconds."""
+        with self.lock:
+            self.now += max(0.0, seconds)
+
+
+def latency_sampler(spec, rng):
+    """
+    Возвращает генератор задержек по описанию из сценария.
+    {"distribution": "fixed", "value": 1},
+    {"distribution": "uniform", "low": 0, "high": 2},
+    {"distribution": "exponential", "mean": 1},
+    {"distribution": "lognormal", "median": 1, "sigma": 0.5}.
+    """
+    if not spec:
+        return lambda: 0.0
+    kind = spec['distribution']
+    if kind == 'fixed':
+        return lambda: spec['value']
+    if kind == 'uniform':
+        return lambda: rng.uniform(spec['low'], spec['high'])
+    if kind == 'exponential':
+        return lambda: rng.expovariate(1 / spec['mean'])
+    if kind == 'lognormal':
+        return lambda: rng.lognormvariate(
+            math.log(spec['median']), spec['sigma']
+        )
+    raise ValueError(f'Неизвестное распределение задержки: {kind}')
+
+
+class FaultProfile:
+    """Задержки и вероятности сбоев одного внешнего сервиса."""
+
+    def __init__(self, spec, kinds, rng):
+        spec = spec or {}
+        faults = spec.get('faults', {})
+        unknown = set(faults) - set(kinds)
+        if unknown:
+            raise ValueError(f'Неизвестные сбои: {", ".join(sorted(unknown))}')
+        self.latency = latency_sampler(spec.get('latency'), rng)
+        self.faults = [
+            (kind, faults[kind]) for kind in kinds if kind in faults
+        ]
+        self.spec = spec
+        self.rng = rng
+
+    def pick(self):
+        """Разыгрывает сбой очередного вызова; None — без сбоя."""
+        roll = self.rng.random()
+        for kind, probability in self.faults:
+            if roll < probability:
+                return kind
+            roll -= probability
+        return None
+
+
+def make_response(status_code, content) -> requests.Response:
+    """Создает ответ requests с заданным телом."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.encoding = 'utf-8'
+    return response
+
+
+class FaultyTransport:
+    """
+    Обертка над requests.get с внедрением сбоев.
+    Пока clock() меньше until, к вызовам добавляются задержки,
+    обрывы соединения, ответы с кодом не 200, обрезанный
+    и некорректный JSON и зависания. Задержка дольше таймаута
+    запроса заканчивается requests.Timeout, как у настоящего клиента.
+    """
+
+    def __init__(self, transport, profile, clock, until=math.inf):
+        self.transport = transport
+        self.profile = profile
+        self.clock = clock
+        self.until = until
+        self.calls = []
+
+    def __call__(self, url, **kwargs):
+        """Выполняет запрос со сбоем согласно профилю."""
+        fault = None
+        if self.clock() < self.until:
+            fault = self.profile.pick()
+            latency = self.profile.latency()
+            if fault == 'stall':
+                latency = self.profile.spec.get('stall', STALL_SECONDS)
+            timeout = kwargs.get('timeout')
+            if timeout is not None and latency >= timeout:
+                self.clock.advance(timeout)
+                self.calls.append((self.clock(), 'timeout'))
+                raise requests.Timeout('read timed out')
+            self.clock.advance(latency)
+        self.calls.append((self.clock(), fault or 'ok'))
+        if fault == 'reset':
+            raise requests.ConnectionError('connection reset by peer')
+        if fault == 'status':
+            return make_response(
+                self.profile.spec.get(
+                    'status_code', HTTPStatus.SERVICE_UNAVAILABLE
+                ),
+                b'{}'
+            )
+        if fault == 'malformed':
+            return make_response(HTTPStatus.OK, b'{"homeworks": "broken"}')
+        response = self.transport(url, **kwargs)
+        if fault == 'truncated':
+            response._content = response.content[:len(response.content) // 2]
+        return response
+
+
+class FaultyBot:
+    """
+    Обертка над telegram.Bot с внедрением сбоев отправки:
+    flood control (RetryAfter), таймаут и обрыв соединения.
+    """
+
+    def __init__(self, bot, profile, clock, until=math.inf):
+        self.bot = bot
+        self.profile = profile
+        self.clock = clock
+        self.until = until
+
+    def send_message(self, chat_id, text):
+        """Отправляет сообщение со сбоем согласно профилю."""
+        if self.clock() < self.until:
+            self.clock.advance(self.profile.latency())
+            fault = self.profile.pick()
+            if fault == 'flood':
+                raise telegram.error.RetryAfter(
+                    self.profile.spec.get('retry_after', RETRY_AFTER)
+                )
+            if fault == 'timeout':
+                raise telegram.error.TimedOut()
+            if fault == 'reset':
+                raise telegram.error.NetworkError('connection reset by peer')
+        return self.bot.send_message(chat_id=chat_id, text=text)
+
+    def __getattr__(self, name):
+        return getattr(self.bot, name)
+
+
+class StatusTimeline:
+    """
+    Заглушка API Практикума: статус работы меняется
+    по кругу каждые change_every секунд виртуального времени.
+    """
+
+    def __init__(self, clock, change_every=CHANGE_EVERY):
+        self.clock = clock
+        self.change_every = change_every
+        self.statuses = list(homework.HOMEWORK_VERDICTS)
+
+    def status_at(self, moment) -> str:
+        """Статус работы в момент moment."""
+        index = int(moment // self.change_every) % len(self.statuses)
+        return self.statuses[index]
+
+    def __call__(self, url, headers=None, params=None, timeout=None):
+        """Отвечает текущим статусом работы."""
+        payload = {
+            'homeworks': [{
+                'homework_name': HOMEWORK_NAME,
+                'status': self.status_at(self.clock()),
+            }],
+            'current_date': int(self.clock()),
+        }
+        return make_response(HTTPStatus.OK, json.dumps(payload).encode())
+
+
+class RecordingBot:
+    """Заглушка telegram.Bot, запоминающая время доставки сообщений."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.delivered = []
+
+    def send_message(self, chat_id, text):
+        """Запоминает сообщение."""
+        self.delivered.append((self.clock(), text))
+
+
+def notification_delays(timeline, delivered, end) -> tuple:
+    """
+    Считает задержку уведомления о каждой смене статуса.
+    Возвращает список задержек и число потерянных уведомлений.
+    """
+    delays = []
+    lost = 0
+    cycle = timeline.change_every * len(timeline.statuses)
+    changed = 0.0
+    while changed < end:
+        verdict = homework.HOMEWORK_VERDICTS[timeline.status_at(changed)]
+        moments = [
+            moment for moment, text in delivered
+            if verdict in text and changed <= moment < changed + cycle
+        ]
+        if moments:
+            delays.append(min(moments) - changed)
+        else:
+            lost += 1
+        changed += timeline.change_every
+    return delays, lost
+
+
+def run_scenario(spec) -> ScenarioResult:
+    """
+    Прогоняет настоящий цикл homework.main() по сценарию.
+    Сбои действуют первые duration секунд, затем еще recovery
+    секунд сервисы работают исправно.
+    """
+    clock = VirtualClock()
+    rng = random.Random(spec.get('seed', 0))
+    duration = spec['duration']
+    end = duration + spec.get('recovery', duration)
+    timeline = StatusTimeline(clock, spec.get('change_every', CHANGE_EVERY))
+    transport = FaultyTransport(
+        timeline, FaultProfile(spec.get('practicum'), PRACTICUM_FAULTS, rng),
+        clock, duration
+    )
+    bot = RecordingBot(clock)
+    errors = Counter()
+    report_error = homework.report_error
+
+    def counted_report_error(error, aggregator):
+        errors[type(error).__name__] += 1
+        report_error(error, aggregator)
+
+    def sleep(seconds):
+        clock.advance(seconds)
+        if clock() >= end:
+            raise StopSoak
+
+    def bot_factory(token):
+        return FaultyBot(
+            bot, FaultProfile(spec.get('telegram'), TELEGRAM_FAULTS, rng),
+            clock, duration
+        )
+
+    logging.disable(logging.CRITICAL)
+    try:
+        with ExitStack() as stack:
+            patch_loop(
+                stack, transport, bot_factory, sleep, counted_report_error
+            )
+            try:
+                homework.main()
+            except StopSoak:
+                pass
+    finally:
+        logging.disable(logging.NOTSET)
+    recovered = [
+        moment for moment, outcome in transport.calls
+        if outcome == 'ok' and moment >= duration
+    ]
+    delays, lost = notification_delays(timeline, bot.delivered, end)
+    return ScenarioResult(
+        spec['name'],
+        min(recovered) - duration if recovered else None,
+        delays, lost,
+        Counter(outcome for _, outcome in transport.calls),
+        errors
+    )
+
+
+def load_scenarios(path) -> list:
+    """Читает сценарии из JSON-файла со списком сценариев."""
+    with open(path) as file:
+        scenarios = json.load(file)
+    if not isinstance(scenarios, list):
+        raise TypeError('Файл сценариев должен содержать список')
+    return scenarios
+
+
+def report(results) -> str:
+    """Готовит текстовый отчет по сценариям."""
+    lines = []
+    for result in results:
+        recovery = (
+            'не восстановился' if result.recovery is None
+            else f'{result.recovery:.0f} с'
+        )
+        delays = sorted(result.delays)
+        median = f'{delays[len(delays) // 2]:.0f} с' if delays else '—'
+        worst = f'{delays[-1]:.0f} с' if delays else '—'
+        lines.append(
+            f'{result.name}: восстановление {recovery}, '
+            f'задержка уведомления медиана {median}, максимум {worst}, '
+            f'потеряно {result.lost}'
+        )
+        lines.append(f'  вызовы API: {_counts(result.faults)}')
+        lines.append(f'  ошибки: {_counts(result.errors)}')
+    return '\n'.join(lines)
+
+
+def _counts(counter):
+    return ', '.join(
+        f'{name}={count}' for name, count in sorted(counter.items())
+    ) or '—'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Прогон цикла бота со сбоями внешних сервисов.'
+    )
+    parser.add_argument(
+        'scenarios', nargs='?', default='fault_scenarios.json',
+        help='JSON-файл со списком сценариев'
+    )
+    arguments = parser.parse_args()
+    print(report(
+        [run_scenario(spec) for spec in load_scenarios(arguments.scenarios)]
+    ))
@@ -0,0 +1,230 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_GRACE: int = 60
+# Запас сверх ожидаемого интервала опроса API для готовности.
+READY_MAX_AGE: int = 1800
+OUTCOME_WINDOW: int = 20
+MAX_FAILURE_RATE: float = 0.5
+
+
+class HealthState:
+    """
+    Состояние здоровья воркера, обновляемое циклом опроса.
+    Все проверки — сравнение пары временных меток, поэтому отвечают
+    за постоянное время и не обращаются к внешним сервисам.
+    """
+
+    def __init__(self, grace=HEARTBEAT_GRACE, ready_max_age=READY_MAX_AGE,
+                 clock=time.monotonic):
+        self.grace = grace
+        self.ready_max_age = ready_max_age
+        self.clock = clock
+        self.started = clock()
+        self.last_heartbeat = self.started
+        self.deadline = self.started + grace
+        self.successes = {}
+        self.failures = {}
+        self.outcomes = {}
+        self.intervals = {}
+        self.tenants = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def heartbeat(self, next_in=0) -> None:
+        """
+        Отмечает, что цикл планировщика жив.
+        next_in — через сколько секунд ожидается следующий heartbeat.
+        """
+        now = self.clock()
+        self.last_heartbeat = now
+        self.deadline = now + next_in + self.grace
+
+    def expect(self, check, interval) -> None:
+        """
+        Отмечает, что следующий вызов check ожидается через interval
+        секунд. None — вызовов не ожидается: узел в резерве
+        или у него нет тенантов.
+        """
+        self.intervals[check] = interval
+
+    def success(self, check, tenant=None) -> None:
+        """Отмечает успешный вызов внешнего сервиса."""
+        now = self.clock()
+        self.successes[check] = now
+        with self.lock:
+            self._outcome(check, True)
+            if tenant is not None:
+                self.tenants[tenant] = now
+
+    def failure(self, check) -> None:
+        """Отмечает неудачный вызов внешнего сервиса."""
+        self.failures[check] = self.clock()
+        with self.lock:
+            self._outcome(check, False)
+
+    def failure_rate(self, check) -> float:
+        """Доля неудачных среди последних OUTCOME_WINDOW вызовов."""
+        with self.lock:
+            outcomes = self.outcomes.get(check)
+            if not outcomes:
+                return 0.0
+            return outcomes.count(False) / len(outcomes)
+
+    def _outcome(self, check, ok) -> None:
+        outcomes = self.outcomes.get(check)
+        if outcomes is None:
+            outcomes = self.outcomes[check] = deque(maxlen=OUTCOME_WINDOW)
+        outcomes.append(ok)
+
+    def forget(self, tenant) -> None:
+        """Удаляет тенанта из отчета."""
+        with self.lock:
+            self.tenants.pop(tenant, None)
+
+    def register(self, name, source) -> None:
+        """Подключает источник метрик: функцию, возвращающую словарь."""
+        self.metrics[name] = source
+
+    def collect(self) -> dict:
+        """Возвращает текущие значения всех подключенных метрик."""
+        return {name: source() for name, source in self.metrics.items()}
+
+    def live(self) -> bool:
+        """Цикл планировщика не пропустил ожидаемый heartbeat."""
+        return self.clock() <= self.deadline
+
+    def ready(self) -> bool:
+        """
+        Воркер готов обслуживать тенантов.
+        Последний успешный ответ API Практикума не старше ожидаемого
+        интервала опроса (см. expect) плюс ready_max_age, а среди
+        недавних отправок в Telegram неудачных не больше
+        MAX_FAILURE_RATE. Узел, которому нечего опрашивать, готов.
+        """
+        interval = self.intervals.get('api', 0)
+        if interval is not None:
+            api = self.successes.get('api', self.started)
+            if self.clock() - api > interval + self.ready_max_age:
+                return False
+        return self.failure_rate('send') <= MAX_FAILURE_RATE
+
+    def detail(self) -> dict:
+        """Возвращает подробный отчет с задержкой по каждому тенанту."""
+        now = self.clock()
+        checks = {}
+        for check in set(self.successes) | set(self.failures):
+            checks[check] = {
+                'success_age': _age(now, self.successes.get(check)),
+                'failure_age': _age(now, self.failures.get(check)),
+                'failure_rate': round(self.failure_rate(check), 3),
+            }
+        with self.lock:
+            tenants = {
+                tenant: round(now - moment, 3)
+                for tenant, moment in self.tenants.items()
+            }
+        return {
+            'live': self.live(),
+            'ready': self.ready(),
+            'uptime': round(now - self.started, 3),
+            'heartbeat_lag': round(now - self.last_heartbeat, 3),
+            'checks': checks,
+            'tenant_lag': tenants,
+            'metrics': self.collect(),
+        }
+
+
+def _age(now, moment):
+    return None if moment is None else round(now - moment, 3)
+
+
+def tracked(handler, health, check, tenant_of=None):
+    """
+    Оборачивает обработчик стадии конвейера.
+    Отмечает в HealthState успех или ошибку вызова внешнего сервиса.
+    """
+    def inner(item):
+        """inner."""
+        try:
+            result = handler(item)
+        except Exception:
+            health.failure(check)
+            raise
+        health.success(check, None if tenant_of is None else tenant_of(item))
+        return result
+    return inner
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """
+    Отвечает на /livez, /readyz, /health (подробный JSON)
+    и /metrics (метрики в текстовом формате Prometheus).
+    """
+
+    state = None
+
+    def do_GET(self):
+        """Обрабатывает GET-запрос проверки здоровья."""
+        if self.path == '/livez':
+            self._reply(self.state.live(), {'live': self.state.live()})
+        elif self.path == '/readyz':
+            self._reply(self.state.ready(), {'ready': self.state.ready()})
+        elif self.path == '/health':
+            detail = self.state.detail()
+            self._reply(detail['live'] and detail['ready'], detail)
+        elif self.path == '/metrics':
+            self._send(
+                HTTPStatus.OK, 'text/plain; version=0.0.4',
+                render_metrics(self.state.collect()).encode()
+            )
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def log_message(self, format, *args):
+        """Пишет журнал запросов в logging вместо stderr."""
+        logger.debug(format % args)
+
+    def _reply(self, healthy, body):
+        status = HTTPStatus.OK if healthy else HTTPStatus.SERVICE_UNAVAILABLE
+        self._send(status, 'application/json', json.dumps(body).encode())
+
+    def _send(self, status, content_type, payload):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def render_metrics(metrics) -> str:
+    """
+    Переводит метрики в текстовый формат Prometheus.
+    Источник name со значением key дает строку
+    homework_bot_<key>{source="<name>"} <value>.
+    """
+    lines = []
+    for name, values in sorted(metrics.items()):
+        for key, value in sorted(values.items()):
+            if isinstance(value, (int, float)):
+                lines.append(f'homework_bot_{key}{{source="{name}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def serve(state, port, host='0.0.0.0'):
+    """Запускает HTTP-сервер проверки здоровья в фоновом потоке."""
+    handler = type('BoundHealthHandler', (HealthHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name='health', daemon=True
+    )
+    thread.start()
+    return server
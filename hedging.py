@@ -0,0 +1,172 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HEDGE_PERCENTILE: float = 95
+HEDGE_RATIO: float = 0.05
+HEDGE_BURST: float = 5.0
+HEDGE_MIN_DELAY: float = 0.05
+HEDGE_MAX_DELAY: float = 5.0
+HEDGE_MIN_SAMPLES: int = 20
+LATENCY_WINDOW: int = 1000
+HEDGE_WORKERS: int = 16
+
+
+class LatencyTracker:
+    """Скользящее окно задержек с быстрым вычислением перцентиля."""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.window = deque()
+        self.size = size
+        self.ordered = []
+        self.lock = threading.Lock()
+
+    def add(self, latency) -> None:
+        """Добавляет задержку, вытесняя самую старую."""
+        with self.lock:
+            if len(self.window) == self.size:
+                oldest = self.window.popleft()
+                del self.ordered[bisect_left(self.ordered, oldest)]
+            self.window.append(latency)
+            insort(self.ordered, latency)
+
+    def percentile(self, value):
+        """Возвращает перцентиль задержки или None, если данных нет."""
+        with self.lock:
+            if not self.ordered:
+                return None
+            index = min(
+                len(self.ordered) - 1, int(len(self.ordered) * value / 100)
+            )
+            return self.ordered[index]
+
+    def __len__(self):
+        return len(self.window)
+
+
+class HedgeBudget:
+    """
+    Бюджет повторных запросов.
+    Каждый основной запрос приносит ratio кредита, повтор тратит
+    целый кредит, поэтому повторов не больше ratio от всех запросов.
+    """
+
+    def __init__(self, ratio=HEDGE_RATIO, burst=HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = 0.0
+        self.lock = threading.Lock()
+
+    def earn(self) -> None:
+        """Начисляет кредит за основной запрос."""
+        with self.lock:
+            self.credit = min(self.burst, self.credit + self.ratio)
+
+    def spend(self) -> bool:
+        """Списывает кредит на повтор, если он есть."""
+        with self.lock:
+            if self.credit < 1:
+                return False
+            self.credit -= 1
+            return True
+
+
+class Hedger:
+    """
+    Выполняет GET-запрос с подстраховкой.
+    Если ответ не пришел за перцентиль HEDGE_PERCENTILE недавних задержек,
+    отправляется второй такой же запрос по другому соединению пула.
+    Побеждает первый успешный ответ, второй отменяется, если еще
+    не начался, или закрывается сразу по завершении.
+    Порог отсчитывается от начала основного запроса, а не от постановки
+    в очередь пула, чтобы ожидание свободного потока не вызывало повторов.
+    Повтор — такой же запрос к API, поэтому перед ним вызывается
+    permit(kwargs), например списание токена ограничителя запросов;
+    без разрешения повтор не отправляется.
+    """
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, budget=None,
+                 min_delay=HEDGE_MIN_DELAY, max_delay=HEDGE_MAX_DELAY,
+                 workers=HEDGE_WORKERS, session=None, permit=None):
+        self.percentile = percentile
+        self.budget = budget if budget is not None else HedgeBudget()
+        self.permit = permit
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latencies = LatencyTracker()
+        self.session = session if session is not None else pooled_session(
+            workers
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hedge'
+        )
+        self.stats = {'requests': 0, 'hedges': 0, 'hedge_wins': 0}
+        self.lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Возвращает порог ожидания перед повтором."""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return self.max_delay
+        threshold = self.latencies.percentile(self.percentile)
+        return min(self.max_delay, max(self.min_delay, threshold))
+
+    def get(self, url, **kwargs):
+        """Выполняет GET с подстраховкой и возвращает первый ответ."""
+        self._count('requests')
+        self.budget.earn()
+        started = threading.Event()
+        primary = self.executor.submit(self._attempt, url, kwargs, started)
+        started.wait()
+        done, _ = wait([primary], timeout=self.delay())
+        if done or not self.budget.spend():
+            return primary.result()
+        if self.permit is not None and not self.permit(kwargs):
+            return primary.result()
+        self._count('hedges')
+        hedge = self.executor.submit(self._attempt, url, kwargs)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winners = [future for future in done if future.exception() is None]
+            if winners or not pending:
+                winner = winners[0] if winners else done.pop()
+                self._discard(pending)
+                if winner is hedge:
+                    self._count('hedge_wins')
+                return winner.result()
+
+    def _count(self, name) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def _attempt(self, url, kwargs, event=None):
+        if event is not None:
+            event.set()
+        started = time.monotonic()
+        response = self.session.get(url, **kwargs)
+        self.latencies.add(time.monotonic() - started)
+        return response
+
+    def _discard(self, futures) -> None:
+        for future in futures:
+            if not future.cancel():
+                future.add_done_callback(_close_response)
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def pooled_session(size) -> requests.Session:
+    """Создает сессию с пулом соединений на size подключений."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
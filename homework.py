@@ -4,11 +4,27 @@ import time
 import telegram
 import requests
 import sys
+from collections import namedtuple
+from functools import partial
 from dotenv import load_dotenv
 from http import HTTPStatus
+from alerts import ErrorAggregator, telegram_notifier
+from concurrency import AdaptiveLimit, bounded
+from dedupe import DedupeCache
+from eventlog import EventLog
+from health import HealthState, serve, tracked
+from hedging import Hedger
 from exceptions import (
     StatusCodeError, ResponseException, TelegramSendMessageException
 )
+from leases import LEASE_TTL, LeaseCoordinator, SQLiteLeaseStore
+from pipeline import Pipeline, Stage
+from polling import PollPredictor
+from ratelimit import RateLimiter, SQLiteBuckets, limited
+from sharedindex import SharedStatusIndex
+from tenants import token_of
+from tracing import CollectorExporter, FileExporter, Tracer, current_span
+from validation import validate_response
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -16,11 +32,36 @@ logger = logging.getLogger(__name__)
 PRACTICUM_TOKEN = os.getenv('YAPRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TGBOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('MY_CHAT_ID')
+OPERATOR_CHAT_ID = os.getenv('OPERATOR_CHAT_ID')
+TENANT_NAME = os.getenv('TENANT_NAME', 'default')
+LEASE_DB = os.getenv('LEASE_DB')
+POLL_HISTORY = os.getenv('POLL_HISTORY')
+EVENT_LOG = os.getenv('EVENT_LOG')
+TRACE_FILE = os.getenv('TRACE_FILE')
+TRACE_COLLECTOR = os.getenv('TRACE_COLLECTOR')
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+HEALTH_PORT = os.getenv('HEALTH_PORT')
+RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB')
+DEDUPE_SHM = os.getenv('DEDUPE_SHM')
+HEDGE_REQUESTS = os.getenv('HEDGE_REQUESTS')
+HEDGER = None
 
 RETRY_PERIOD: int = 600
-ENDPOINT: str = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+REQUEST_TIMEOUT: int = 30
+ENDPOINT: str = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+PIPELINE_CAPACITY: int = 100
+FETCH_WORKERS: int = 4
+SEND_WORKERS: int = 2
+FETCH_MAX_CONCURRENCY: int = 16
+SEND_MAX_CONCURRENCY: int = 8
+# Основной запрос и повтор на каждый поток запроса.
+HEDGE_WORKERS: int = 2 * FETCH_MAX_CONCURRENCY
+
 
 ACTUAL_STATUS = ''
 HOMEWORK_VERDICTS = {
@@ -29,20 +70,30 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+Notification = namedtuple('Notification', ('text', 'release'))
+
 
-def check_content_message():
+def check_content_message(cache=None):
     """
     Проверка на повторяемость результатов.
     Необходимо что бы бот постоянно не отправлял сообщения,
-    а только по факту изменения
+    а только по факту изменения. Последние статусы хранятся
+    в ограниченном по памяти кэше по ключу тенанта и работы,
+    без работы — последнее сообщение по ключу тенанта.
+    Возвращает Notification: release снимает запомненный статус,
+    если уведомление не удалось доставить.
     """
-    message = ['']
+    if cache is None:
+        cache = DedupeCache()
 
-    def inner(args):
+    def inner(args, key=TENANT_NAME, homework=None):
         """inner."""
-        if message[0] != args:
-            message[0] = args
-            return message[0]
+        value = args
+        if homework is not None:
+            key = (key, homework.get('homework_name'))
+            value = homework.get('status')
+        if cache.is_new(key, value):
+            return Notification(args, partial(cache.release, key, value))
         return None
 
     return inner
@@ -68,18 +119,36 @@ def send_message(bot, message) -> None:
     Принимает на вход два параметра:
     экземпляр класса Bot и строку с текстом сообщения.
     """
+    deliver(bot, TELEGRAM_CHAT_ID, message)
+
+
+def deliver(bot, chat_id, message) -> None:
+    """Отправляет сообщение в указанный чат Telegram."""
     try:
         if message is not None:
             logger.debug(f'Бот отправляет сообщение {message}')
             bot.send_message(
-                chat_id=TELEGRAM_CHAT_ID,
+                chat_id=chat_id,
                 text=message
             )
             logger.debug('Сообщение отправлено')
     except telegram.TelegramError as error:
         message = f'Сообщение не отправлено. {error}'
         logger.error(message)
-        raise TelegramSendMessageException(message)
+        raise TelegramSendMessageException(message) from error
+
+
+def send_notification(send, notification) -> None:
+    """
+    Отправляет текст уведомления функцией send.
+    Если отправка не удалась, статус снимается с учета
+    в check_content_message, и уведомление уйдет при следующем опросе.
+    """
+    try:
+        send(notification.text)
+    except Exception:
+        notification.release()
+        raise
 
 
 def get_api_answer(timestamp):
@@ -89,23 +158,35 @@ def get_api_answer(timestamp):
     В случае успешного запроса должна вернуть ответ API,
     приведя его из формата JSON к типам данных Python.
     """
+    return request_statuses(HEADERS, timestamp)
+
+
+def request_statuses(headers, timestamp):
+    """
+    Запрашивает статусы работ с заголовками конкретного тенанта.
+    При заданном HEDGE_REQUESTS медленный запрос подстраховывается
+    повторным, см. hedging.Hedger.
+    """
+    get = requests.get if HEDGER is None else HEDGER.get
     try:
-        homework_statuses = requests.get(
+        homework_statuses = get(
             ENDPOINT,
-            headers=HEADERS,
+            headers=headers,
             params={
                 'from_date': timestamp
-            }
+            },
+            timeout=REQUEST_TIMEOUT
         )
     except requests.RequestException as error:
-        raise ResponseException(error)
+        raise ResponseException(error) from error
 
     if homework_statuses.status_code == HTTPStatus.OK:
         return homework_statuses.json()
     else:
         raise StatusCodeError(
             f'Упс, возникла проблемка начальник. '
-            f'Статус код: {homework_statuses.status_code}'
+            f'Статус код: {homework_statuses.status_code}',
+            homework_statuses.status_code
         )
 
 
@@ -114,14 +195,10 @@ def check_response(response):
     Проверяет ответ API на соответствие документации.
     В качестве параметра функция получает ответ API,
     приведенный к типам данных Python.
+    Возвращает ValidationResult с корректными и отклоненными
+    записями; пустой список работ ошибкой не считается.
     """
-    if not isinstance(response, dict):
-        raise TypeError('Ожидаемый тип данных для response: dict')
-    if not isinstance(response.get('homeworks'), list):
-        raise TypeError('Ожидаемый тип данных для homeworks: list')
-    if len(response.get('homeworks')) == 0:
-        raise TypeError('Отсутствуют данные о домашней работе')
-    return True
+    return validate_response(response, HOMEWORK_VERDICTS)
 
 
 def parse_status(homework):
@@ -145,29 +222,309 @@ def parse_status(homework):
     )
 
 
+def process_response(response, message_content, aggregator, observers=()):
+    """
+    Стадия обработки конвейера.
+    Проверяет ответ API и готовит сообщение,
+    если статус работы изменился. Каждая корректная запись
+    передается наблюдателям (предсказатель опроса, журнал событий).
+    """
+    result = check_response(response)
+    if not result or result.empty:
+        return None
+    for homework, reason in result.rejected:
+        logger.warning(f'Запись отклонена: {reason}')
+        aggregator.register(TypeError(reason))
+    for homework in result.valid:
+        for observer in observers:
+            observer.observe(homework)
+    if result.valid:
+        current_span().set(
+            homework=result.valid[0].get('homework_name'),
+            status=result.valid[0].get('status')
+        )
+        return message_content(
+            parse_status(result.valid[0]), homework=result.valid[0]
+        )
+    return None
+
+
+def report_error(error, aggregator) -> None:
+    """Логирует сбой стадии конвейера и передает его в агрегатор."""
+    message = f'Сбой в работе программы: {error}'
+    logger.error(message)
+    aggregator.register(error)
+
+
+def build_pipeline(bot, message_content, aggregator, observers=(),
+                   health=None, limiter=None, limits=None) -> Pipeline:
+    """
+    Собирает конвейер запрос -> обработка -> отправка.
+    Обработка выполняется в одном потоке, а отправки в один чат —
+    в одном потоке стадии отправки, поэтому уведомления приходят
+    в порядке смены статусов.
+    limits — адаптивные пределы параллельности из build_limits.
+    """
+    fetch = get_api_answer
+    send = partial(send_notification, partial(send_message, bot))
+    fetch_workers, send_workers = FETCH_WORKERS, SEND_WORKERS
+    if limits is not None:
+        fetch, send = bounded_upstreams(fetch, send, limits)
+        fetch_workers = FETCH_MAX_CONCURRENCY
+        send_workers = SEND_MAX_CONCURRENCY
+    if limiter is not None:
+        fetch = limited(fetch, limiter, lambda item: PRACTICUM_TOKEN)
+    if health is not None:
+        fetch = tracked(fetch, health, 'api', lambda item: TENANT_NAME)
+        send = tracked(send, health, 'send')
+    return Pipeline(
+        [
+            Stage(
+                'fetch', fetch,
+                workers=fetch_workers, capacity=PIPELINE_CAPACITY
+            ),
+            Stage(
+                'process',
+                partial(
+                    process_response,
+                    message_content=message_content,
+                    aggregator=aggregator,
+                    observers=observers
+                ),
+                capacity=PIPELINE_CAPACITY
+            ),
+            Stage(
+                'send', send,
+                workers=send_workers, capacity=PIPELINE_CAPACITY,
+                key=lambda item: TELEGRAM_CHAT_ID
+            ),
+        ],
+        on_error=partial(report_error, aggregator=aggregator)
+    )
+
+
+def build_limits(health=None) -> dict:
+    """
+    Создает адаптивные пределы параллельности вызовов.
+    Отдельный предел для API Практикума и для Telegram;
+    текущие значения публикуются в метриках HealthState.
+    """
+    limits = {
+        'practicum': AdaptiveLimit(
+            'practicum', FETCH_WORKERS, FETCH_MAX_CONCURRENCY
+        ),
+        'telegram': AdaptiveLimit(
+            'telegram', SEND_WORKERS, SEND_MAX_CONCURRENCY
+        ),
+    }
+    if health is not None:
+        for name, limit in limits.items():
+            health.register(name, limit.snapshot)
+    return limits
+
+
+def practicum_overloaded(error) -> bool:
+    """
+    Признак перегрузки API Практикума: код 429 или 5xx либо таймаут.
+    Прочие коды, например 401 от неверного токена одного тенанта,
+    и обрывы соединения о загрузке API не говорят.
+    """
+    if isinstance(error, StatusCodeError):
+        code = error.status_code
+        return code is not None and (
+            code == HTTPStatus.TOO_MANY_REQUESTS
+            or code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+    return isinstance(error.__cause__, requests.Timeout)
+
+
+def telegram_overloaded(error) -> bool:
+    """
+    Признак перегрузки Telegram: flood control, таймаут или сбой сети.
+    BadRequest наследует NetworkError, но говорит об ошибке в запросе,
+    а Unauthorized — о неверном токене, поэтому предел они не снижают.
+    """
+    cause = error.__cause__
+    if isinstance(cause, telegram.error.BadRequest):
+        return False
+    return isinstance(
+        cause, (telegram.error.RetryAfter, telegram.error.NetworkError)
+    )
+
+
+def bounded_upstreams(fetch, send, limits) -> tuple:
+    """
+    Ограничивает обработчики запроса и отправки адаптивными пределами.
+    Перегрузкой API считаются ошибки из practicum_overloaded,
+    перегрузкой Telegram — ошибки из telegram_overloaded.
+    """
+    return (
+        bounded(
+            fetch, limits['practicum'],
+            (StatusCodeError, ResponseException), practicum_overloaded
+        ),
+        bounded(
+            send, limits['telegram'],
+            TelegramSendMessageException, telegram_overloaded
+        ),
+    )
+
+
+def build_dedupe():
+    """
+    Создает хранилище последних статусов.
+    При заданном DEDUPE_SHM — общий индекс в разделяемой памяти
+    для всех процессов воркера на хосте.
+    """
+    if DEDUPE_SHM:
+        return SharedStatusIndex(DEDUPE_SHM)
+    return DedupeCache()
+
+
+def hedge_permit(limiter, kwargs) -> bool:
+    """
+    Списывает токен ограничителя на повторный запрос.
+    Повтор не ждет корзину: если токенов нет, его не будет.
+    """
+    return limiter.try_acquire(token_of(kwargs['headers']))
+
+
+def build_hedger(limiter=None):
+    """
+    Включает подстраховку медленных запросов, если задан HEDGE_REQUESTS.
+    Пул потоков создается при запуске бота, а не при импорте модуля.
+    Повторы расходуют токены limiter наравне с основными запросами.
+    """
+    global HEDGER
+    if HEDGE_REQUESTS and HEDGER is None:
+        HEDGER = Hedger(
+            workers=HEDGE_WORKERS,
+            permit=None if limiter is None else partial(hedge_permit, limiter)
+        )
+    return HEDGER
+
+
+def build_coordinator():
+    """
+    Включает координацию узлов через аренды, если задан LEASE_DB.
+    Тогда тенант опрашивает только узел, владеющий его партицией,
+    а остальные копии воркера ждут в резерве.
+    """
+    if not LEASE_DB:
+        return None
+    coordinator = LeaseCoordinator(SQLiteLeaseStore(LEASE_DB))
+    coordinator.start()
+    return coordinator
+
+
+def build_predictor():
+    """
+    Включает предсказание интервала опроса, если задан POLL_HISTORY.
+    Без истории бот опрашивает API каждые RETRY_PERIOD секунд.
+    """
+    if not POLL_HISTORY:
+        return None
+    return PollPredictor(POLL_HISTORY, default=RETRY_PERIOD)
+
+
+def build_observers(predictor):
+    """Возвращает наблюдателей за записями о домашних работах."""
+    observers = []
+    if predictor is not None:
+        observers.append(predictor)
+    if EVENT_LOG:
+        observers.append(EventLog(EVENT_LOG, tenant=TENANT_NAME))
+    return observers
+
+
+def build_tracer() -> Tracer:
+    """
+    Настраивает трассировку цикла опроса.
+    Спаны пишутся в TRACE_FILE или отправляются на TRACE_COLLECTOR;
+    если не задано ни то, ни другое, трассировка выключена.
+    """
+    if TRACE_COLLECTOR:
+        return Tracer(CollectorExporter(TRACE_COLLECTOR), TRACE_SAMPLE_RATE)
+    if TRACE_FILE:
+        return Tracer(FileExporter(TRACE_FILE), TRACE_SAMPLE_RATE)
+    return Tracer()
+
+
+def build_limiter() -> RateLimiter:
+    """
+    Создает ограничитель запросов к API Практикума.
+    При заданном RATE_LIMIT_DB корзины токенов общие
+    для всех процессов воркера на хосте.
+    """
+    if RATE_LIMIT_DB:
+        return RateLimiter(SQLiteBuckets(RATE_LIMIT_DB))
+    return RateLimiter()
+
+
+def build_health() -> HealthState:
+    """Создает состояние здоровья и, если задан HEALTH_PORT, HTTP-сервер."""
+    health = HealthState()
+    if HEALTH_PORT:
+        serve(health, int(HEALTH_PORT))
+    return health
+
+
+def watch_pipeline(pipeline, health) -> None:
+    """
+    Публикует загрузку конвейера в метриках HealthState:
+    каждая стадия — отдельный источник pipeline_<стадия>.
+    """
+    for stage in pipeline.stages:
+        health.register(f'pipeline_{stage.name}', stage.occupancy)
+
+
 def main():
     """Основная логика работы бота."""
     check_tokens()
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    limiter = build_limiter()
+    build_hedger(limiter)
     # test unix time 1674831185
     timestamp = int(time.time())
-    message_content = check_content_message()
-
-    while True:
-        try:
-            response = get_api_answer(timestamp)
-            if check_response(response):
-                result = parse_status(
-                    response.get('homeworks')[0]
-                )
-                message = message_content(result)
-                send_message(bot, message)
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logger.error(message)
-
-        time.sleep(RETRY_PERIOD)
+    message_content = check_content_message(build_dedupe())
+    aggregator = ErrorAggregator(
+        telegram_notifier(bot, OPERATOR_CHAT_ID or TELEGRAM_CHAT_ID)
+    )
+    predictor = build_predictor()
+    health = build_health()
+    pipeline = build_pipeline(
+        bot, message_content, aggregator, build_observers(predictor),
+        health, limiter, build_limits(health)
+    )
+    watch_pipeline(pipeline, health)
+    pipeline.start()
+    coordinator = build_coordinator()
+    tracer = build_tracer()
+
+    try:
+        while True:
+            delay = (
+                RETRY_PERIOD if predictor is None else predictor.next_delay()
+            )
+            if coordinator is None or coordinator.owns(TENANT_NAME):
+                # Один тенант: цикл ждет окончания опроса, стадии
+                # перекрываются в worker.py, где тенантов много.
+                with tracer.start_trace('poll', tenant=TENANT_NAME) as span:
+                    pipeline.put(timestamp, span)
+                    pipeline.join()
+                health.expect('api', delay)
+            else:
+                delay = LEASE_TTL
+                health.expect('api', None)
+            aggregator.flush()
+            health.heartbeat(delay)
+            time.sleep(delay)
+    finally:
+        pipeline.stop()
+        tracer.close()
+        if coordinator is not None:
+            coordinator.stop()
 
 
 if __name__ == '__main__':
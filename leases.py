@@ -0,0 +1,239 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL: int = 15
+LEASE_PARTITIONS: int = 64
+
+Lease = namedtuple('Lease', ('partition', 'owner', 'expires'))
+
+
+def partition_of(key, partitions=LEASE_PARTITIONS) -> int:
+    """Возвращает номер партиции для ключа тенанта."""
+    return zlib.crc32(str(key).encode()) % partitions
+
+
+def default_node_id() -> str:
+    """Возвращает идентификатор узла: имя хоста и PID процесса."""
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+class LeaseStore:
+    """
+    Интерфейс общего хранилища аренд.
+    Сетевые хранилища (Redis, etcd, PostgreSQL) реализуют те же методы;
+    все операции должны быть атомарными относительно других узлов.
+    """
+
+    def acquire(self, partition, owner, ttl) -> bool:
+        """Захватывает свободную или просроченную аренду."""
+        raise NotImplementedError
+
+    def renew(self, partition, owner, ttl) -> bool:
+        """Продлевает аренду, если она все еще принадлежит owner."""
+        raise NotImplementedError
+
+    def release(self, partition, owner) -> None:
+        """Освобождает аренду, принадлежащую owner."""
+        raise NotImplementedError
+
+    def leases(self) -> dict:
+        """Возвращает все аренды по номерам партиций."""
+        raise NotImplementedError
+
+    def register_node(self, node, ttl) -> None:
+        """Отмечает узел живым на ttl секунд."""
+        raise NotImplementedError
+
+    def unregister_node(self, node) -> None:
+        """Удаляет узел из списка живых."""
+        raise NotImplementedError
+
+    def live_nodes(self) -> list:
+        """Возвращает список живых узлов."""
+        raise NotImplementedError
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """
+    Хранилище аренд в файле SQLite для узлов на одном хосте.
+    Взаимное исключение обеспечивают файловые блокировки SQLite.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS leases ('
+                'partition INTEGER PRIMARY KEY, owner TEXT, expires REAL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS nodes ('
+                'node TEXT PRIMARY KEY, expires REAL)'
+            )
+
+    def acquire(self, partition, owner, ttl) -> bool:
+        """Захватывает свободную или просроченную аренду."""
+        now = self.clock()
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT INTO leases (partition, owner, expires) '
+                'VALUES (?, ?, ?) ON CONFLICT(partition) DO UPDATE '
+                'SET owner = excluded.owner, expires = excluded.expires '
+                'WHERE leases.owner = excluded.owner OR leases.expires < ?',
+                (partition, owner, now + ttl, now)
+            )
+            row = connection.execute(
+                'SELECT owner FROM leases WHERE partition = ?', (partition,)
+            ).fetchone()
+        return row[0] == owner
+
+    def renew(self, partition, owner, ttl) -> bool:
+        """Продлевает аренду, если она все еще принадлежит owner."""
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                'UPDATE leases SET expires = ? '
+                'WHERE partition = ? AND owner = ?',
+                (self.clock() + ttl, partition, owner)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, partition, owner) -> None:
+        """Освобождает аренду, принадлежащую owner."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'DELETE FROM leases WHERE partition = ? AND owner = ?',
+                (partition, owner)
+            )
+
+    def leases(self) -> dict:
+        """Возвращает все аренды по номерам партиций."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                'SELECT partition, owner, expires FROM leases'
+            ).fetchall()
+        return {row[0]: Lease(*row) for row in rows}
+
+    def register_node(self, node, ttl) -> None:
+        """Отмечает узел живым на ttl секунд."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT INTO nodes (node, expires) VALUES (?, ?) '
+                'ON CONFLICT(node) DO UPDATE SET expires = excluded.expires',
+                (node, self.clock() + ttl)
+            )
+
+    def unregister_node(self, node) -> None:
+        """Удаляет узел из списка живых."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM nodes WHERE node = ?', (node,))
+
+    def live_nodes(self) -> list:
+        """Возвращает список живых узлов."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                'SELECT node FROM nodes WHERE expires >= ?', (self.clock(),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=LEASE_TTL)
+
+
+class LeaseCoordinator:
+    """
+    Распределяет партиции тенантов между узлами через аренды.
+    Каждый узел держит не больше своей доли партиций и продлевает
+    их по heartbeat; аренды упавшего узла истекают через ttl
+    и забираются оставшимися узлами на следующем heartbeat.
+    """
+
+    def __init__(self, store, node_id=None, partitions=LEASE_PARTITIONS,
+                 ttl=LEASE_TTL, clock=time.time):
+        self.store = store
+        self.node_id = node_id or default_node_id()
+        self.partitions = partitions
+        self.ttl = ttl
+        self.clock = clock
+        self.owned = frozenset()
+        self.valid_until = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def heartbeat(self) -> frozenset:
+        """Продлевает свои аренды и добирает свою долю партиций."""
+        started = self.clock()
+        self.store.register_node(self.node_id, self.ttl)
+        nodes = max(1, len(self.store.live_nodes()))
+        share = -(-self.partitions // nodes)
+        owned = {
+            partition for partition in self.owned
+            if self.store.renew(partition, self.node_id, self.ttl)
+        }
+        leases = self.store.leases()
+        for partition in range(self.partitions):
+            if len(owned) >= share:
+                break
+            lease = leases.get(partition)
+            if partition in owned:
+                continue
+            if lease and lease.owner != self.node_id and (
+                lease.expires >= started
+            ):
+                continue
+            if self.store.acquire(partition, self.node_id, self.ttl):
+                owned.add(partition)
+        surplus = sorted(owned, reverse=True)[:max(0, len(owned) - share)]
+        for partition in surplus:
+            self.store.release(partition, self.node_id)
+            owned.discard(partition)
+        self.owned = frozenset(owned)
+        self.valid_until = started + self.ttl
+        return self.owned
+
+    def owns(self, key) -> bool:
+        """
+        Проверяет, что тенант принадлежит этому узлу.
+        Если аренды не удалось продлить вовремя, узел считает,
+        что ничем не владеет, чтобы не опрашивать тенант дважды.
+        """
+        if self.clock() > self.valid_until:
+            return False
+        return partition_of(key, self.partitions) in self.owned
+
+    def start(self) -> None:
+        """Выполняет первый heartbeat и запускает фоновое продление."""
+        self._beat()
+        self.thread = threading.Thread(
+            target=self._run, name='lease-heartbeat', daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Останавливает продление и сразу отдает аренды другим узлам."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        for partition in self.owned:
+            self.store.release(partition, self.node_id)
+        self.store.unregister_node(self.node_id)
+        self.owned = frozenset()
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.ttl / 3):
+            self._beat()
+
+    def _beat(self) -> None:
+        try:
+            self.heartbeat()
+        except Exception as error:
+            logger.error(f'Не удалось продлить аренды: {error}')
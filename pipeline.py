@@ -0,0 +1,153 @@
+import logging
+import queue
+import threading
+import time
+import zlib
+
+from tracing import NOOP_SPAN
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+
+
+class Stage:
+    """
+    Стадия конвейера: ограниченная очередь и пул рабочих потоков.
+    Обработчик получает элемент очереди и возвращает элемент
+    для следующей стадии; None означает, что дальше передавать нечего.
+
+    Если задан key, у каждого потока своя очередь, и элементы с одним
+    ключом всегда попадают в один поток, то есть обрабатываются
+    в порядке поступления. Общий объем очередей — capacity.
+    """
+
+    def __init__(self, name, handler, workers=1, capacity=100, key=None):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.key = key
+        count = 1 if key is None else workers
+        self.queues = [
+            queue.Queue(maxsize=max(1, capacity // count))
+            for _ in range(count)
+        ]
+        self.busy = 0
+        self.processed = 0
+        self.lock = threading.Lock()
+
+    def put(self, entry, item, timeout=None) -> None:
+        """Ставит элемент в очередь потока, отвечающего за его ключ."""
+        self.queue_for(item).put(entry, timeout=timeout)
+
+    def queue_for(self, item) -> queue.Queue:
+        """Возвращает очередь, в которую попадает элемент."""
+        if self.key is None:
+            return self.queues[0]
+        key = str(self.key(item)).encode()
+        return self.queues[zlib.crc32(key) % len(self.queues)]
+
+    def occupancy(self) -> dict:
+        """Возвращает заполненность очередей и число занятых потоков."""
+        with self.lock:
+            busy = self.busy
+            processed = self.processed
+        return {
+            'queued': sum(pending.qsize() for pending in self.queues),
+            'capacity': sum(pending.maxsize for pending in self.queues),
+            'busy': busy,
+            'workers': self.workers,
+            'processed': processed,
+        }
+
+
+class Pipeline:
+    """
+    Цепочка стадий, связанных ограниченными очередями.
+    Если следующая стадия не успевает, запись в ее очередь блокируется,
+    и предыдущая стадия замедляется вместе с ней (backpressure).
+    Вместе с элементом по стадиям передается спан трассы: каждая
+    стадия открывает дочерний спан с временем ожидания в очереди.
+    """
+
+    def __init__(self, stages, on_error=None):
+        self.stages = stages
+        self.on_error = on_error
+        self.threads = {}
+
+    def start(self) -> None:
+        """Запускает рабочие потоки всех стадий."""
+        for index, stage in enumerate(self.stages):
+            following = (
+                self.stages[index + 1] if index + 1 < len(self.stages)
+                else None
+            )
+            self.threads[stage.name] = []
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(
+                        stage, stage.queues[number % len(stage.queues)],
+                        following
+                    ),
+                    name=f'{stage.name}-{number}',
+                    daemon=True
+                )
+                thread.start()
+                self.threads[stage.name].append(thread)
+
+    def put(self, item, span=NOOP_SPAN, timeout=None) -> None:
+        """Передает элемент на вход конвейера; блокируется при заполнении."""
+        self.stages[0].put(
+            (span, time.monotonic(), item), item, timeout=timeout
+        )
+
+    def join(self) -> None:
+        """Ожидает, пока все переданные элементы пройдут конвейер."""
+        for stage in self.stages:
+            for stage_queue in stage.queues:
+                stage_queue.join()
+
+    def stop(self) -> None:
+        """
+        Останавливает рабочие потоки, стадию за стадией.
+        Каждая стадия успевает передать дальше все, что уже приняла.
+        """
+        for stage in self.stages:
+            for number, _ in enumerate(self.threads.get(stage.name, ())):
+                stage.queues[number % len(stage.queues)].put(STOP)
+            for thread in self.threads.pop(stage.name, ()):
+                thread.join()
+
+    def occupancy(self) -> dict:
+        """Возвращает загрузку каждой стадии для подбора параметров."""
+        return {stage.name: stage.occupancy() for stage in self.stages}
+
+    def _work(self, stage, source, following) -> None:
+        while True:
+            item = source.get()
+            if item is STOP:
+                source.task_done()
+                return
+            span, enqueued, item = item
+            with stage.lock:
+                stage.busy += 1
+            try:
+                with span.child(stage.name) as child:
+                    child.set(queued=time.monotonic() - enqueued)
+                    result = stage.handler(item)
+                if result is not None and following is not None:
+                    following.put((span, time.monotonic(), result), result)
+            except Exception as error:
+                self._report(error, stage)
+            finally:
+                with stage.lock:
+                    stage.busy -= 1
+                    stage.processed += 1
+                source.task_done()
+
+    def _report(self, error, stage) -> None:
+        if self.on_error is None:
+            logger.error(f'Сбой на стадии {stage.name}: {error}')
+            return
+        self.on_error(error)
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL: int = 60
+MAX_INTERVAL: int = 3600
+TARGET_PROBABILITY: float = 0.2
+MIN_SAMPLES: int = 20
+HISTORY_SIZE: int = 10000
+DATE_FORMAT: str = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def parse_date(value, default):
+    """
+    Переводит date_updated из ответа API в unix time.
+    Дата в API указана в UTC (суффикс Z) и не зависит от пояса хоста.
+    """
+    try:
+        return datetime.strptime(value, DATE_FORMAT).replace(
+            tzinfo=timezone.utc
+        ).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+def slot_of(timestamp) -> int:
+    """Возвращает номер часа недели (0..167) для временной метки."""
+    moment = datetime.fromtimestamp(timestamp)
+    return moment.weekday() * 24 + moment.hour
+
+
+class PollPredictor:
+    """
+    Подбирает интервал опроса по истории смены статусов.
+    Для текущего статуса оценивается вероятность смены в ближайший
+    MAX_INTERVAL по уже прошедшему времени в статусе, она умножается
+    на активность ревьюеров в этот час недели, и опрос назначается
+    так, чтобы до него статус сменился с вероятностью TARGET_PROBABILITY.
+    """
+
+    def __init__(self, path=None, default=600, min_interval=MIN_INTERVAL,
+                 max_interval=MAX_INTERVAL, clock=time.time):
+        self.path = path
+        self.default = default
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.durations = {}
+        self.activity = [0] * 168
+        self.current = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def record(self, status, entered, changed) -> None:
+        """Учитывает завершившееся пребывание работы в статусе."""
+        if len(self.history) == self.history.maxlen:
+            self._forget(*self.history[0])
+        self.history.append((status, entered, changed))
+        insort(self.durations.setdefault(status, []), changed - entered)
+        self.activity[slot_of(changed)] += 1
+
+    def observe(self, homework) -> None:
+        """
+        Отмечает текущий статус работы из ответа API.
+        При смене статуса длительность прошлого статуса попадает в историю.
+        """
+        name = homework.get('homework_name')
+        status = homework.get('status')
+        now = self.clock()
+        changed = parse_date(homework.get('date_updated'), now)
+        with self.lock:
+            previous = self.current.get(name)
+            if previous is not None and previous[0] == status:
+                return
+            self.current[name] = (status, changed)
+            if previous is None:
+                return
+            self.record(previous[0], previous[1], changed)
+        if self.path:
+            self.save()
+
+    def change_rate(self, status, elapsed, now) -> float:
+        """
+        Оценивает частоту смены статуса (в секунду) в ближайшее время.
+        Возвращает None, если истории для статуса недостаточно.
+        """
+        durations = self.durations.get(status, ())
+        survivors = len(durations) - bisect_right(durations, elapsed)
+        if survivors < MIN_SAMPLES:
+            return None
+        changes = bisect_right(
+            durations, elapsed + self.max_interval
+        ) - bisect_right(durations, elapsed)
+        probability = changes / survivors
+        total = sum(self.activity)
+        weight = (self.activity[slot_of(now)] + 1) * 168 / (total + 168)
+        return probability * weight / self.max_interval
+
+    def next_delay(self) -> int:
+        """Возвращает паузу до следующего опроса в секундах."""
+        now = self.clock()
+        with self.lock:
+            rates = [
+                self.change_rate(status, now - entered, now)
+                for status, entered in self.current.values()
+            ]
+        rates = [rate for rate in rates if rate is not None]
+        if not rates:
+            return self.default
+        rate = sum(rates)
+        if rate <= 0:
+            return self.max_interval
+        delay = TARGET_PROBABILITY / rate
+        return int(min(self.max_interval, max(self.min_interval, delay)))
+
+    def load(self) -> None:
+        """Загружает историю и текущие статусы из файла."""
+        with open(self.path, encoding='utf-8') as file:
+            data = json.load(file)
+        for status, entered, changed in data.get('history', ()):
+            self.record(status, entered, changed)
+        self.current = {
+            name: tuple(value)
+            for name, value in data.get('current', {}).items()
+        }
+
+    def save(self) -> None:
+        """Сохраняет историю и текущие статусы в файл."""
+        with self.lock:
+            data = {
+                'history': list(self.history),
+                'current': dict(self.current)
+            }
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(temporary, self.path)
+
+    def _forget(self, status, entered, changed) -> None:
+        durations = self.durations[status]
+        del durations[bisect_left(durations, changed - entered)]
+        self.activity[slot_of(changed)] -= 1
@@ -0,0 +1,173 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import closing
+
+GLOBAL_RATE: float = 5.0
+GLOBAL_BURST: float = 10.0
+TOKEN_RATE: float = 0.5
+TOKEN_BURST: float = 2.0
+INTERACTIVE_RESERVE: float = 2.0
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+Bucket = namedtuple('Bucket', ('name', 'rate', 'burst'))
+
+
+class MemoryBuckets:
+    """Корзины токенов в памяти процесса."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.state = {}
+        self.lock = threading.Lock()
+
+    def take(self, buckets, reserve) -> float:
+        """
+        Берет по токену из каждой корзины, если во всех хватает.
+        Возвращает 0 при успехе или время ожидания в секундах.
+        """
+        with self.lock:
+            now = self.clock()
+            levels = [self._level(bucket, now) for bucket in buckets]
+            wait = _wait(buckets, levels, reserve)
+            if wait > 0:
+                return wait
+            for bucket, level in zip(buckets, levels):
+                self.state[bucket.name] = (level - 1, now)
+            return 0.0
+
+    def _level(self, bucket, now):
+        tokens, updated = self.state.get(bucket.name, (bucket.burst, now))
+        return min(bucket.burst, tokens + (now - updated) * bucket.rate)
+
+
+class SQLiteBuckets:
+    """
+    Корзины токенов в файле SQLite, общие для всех процессов хоста.
+    Списание выполняется в транзакции BEGIN IMMEDIATE, поэтому
+    процессы не могут одновременно взять один и тот же токен.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        with closing(self._connect()) as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'name TEXT PRIMARY KEY, tokens REAL, updated REAL)'
+            )
+
+    def take(self, buckets, reserve) -> float:
+        """
+        Берет по токену из каждой корзины, если во всех хватает.
+        Возвращает 0 при успехе или время ожидания в секундах.
+        """
+        with closing(self._connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                now = self.clock()
+                levels = [
+                    self._level(connection, bucket, now) for bucket in buckets
+                ]
+                wait = _wait(buckets, levels, reserve)
+                if wait <= 0:
+                    connection.executemany(
+                        'INSERT INTO buckets (name, tokens, updated) '
+                        'VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE SET '
+                        'tokens = excluded.tokens, updated = excluded.updated',
+                        [
+                            (bucket.name, level - 1, now)
+                            for bucket, level in zip(buckets, levels)
+                        ]
+                    )
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                connection.execute('ROLLBACK')
+                raise
+        return max(0.0, wait)
+
+    def _level(self, connection, bucket, now):
+        row = connection.execute(
+            'SELECT tokens, updated FROM buckets WHERE name = ?',
+            (bucket.name,)
+        ).fetchone()
+        if row is None:
+            return bucket.burst
+        tokens, updated = row
+        return min(bucket.burst, tokens + max(0, now - updated) * bucket.rate)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+
+def _wait(buckets, levels, reserve) -> float:
+    wait = 0.0
+    for bucket, level in zip(buckets, levels):
+        need = 1 + min(reserve, bucket.burst - 1)
+        if level < need:
+            wait = max(wait, (need - level) / bucket.rate)
+    return wait
+
+
+class RateLimiter:
+    """
+    Ограничитель запросов к API Практикума.
+    Общая корзина на хост и отдельная корзина на каждый токен.
+    Запрос не получает ошибку, а ждет, пока в корзинах появятся токены,
+    поэтому всплески растягиваются в ровный поток. Фоновые опросы
+    не трогают последние INTERACTIVE_RESERVE токенов: их забирают
+    интерактивные запросы, которые поэтому проходят первыми.
+    """
+
+    def __init__(self, store=None, rate=GLOBAL_RATE, burst=GLOBAL_BURST,
+                 token_rate=TOKEN_RATE, token_burst=TOKEN_BURST,
+                 reserve=INTERACTIVE_RESERVE, sleep=time.sleep):
+        self.store = store if store is not None else MemoryBuckets()
+        self.global_bucket = Bucket('global', rate, burst)
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.reserve = reserve
+        self.sleep = sleep
+        self.waited = 0.0
+
+    def acquire(self, token, priority=BACKGROUND) -> float:
+        """Ждет разрешения на запрос; возвращает время ожидания."""
+        buckets = self._buckets(token)
+        reserve = self._reserve(priority)
+        waited = 0.0
+        while True:
+            wait = self.store.take(buckets, reserve)
+            if wait <= 0:
+                self.waited += waited
+                return waited
+            self.sleep(wait)
+            waited += wait
+
+    def try_acquire(self, token, priority=BACKGROUND) -> bool:
+        """Берет разрешение на запрос без ожидания, если оно есть."""
+        return self.store.take(
+            self._buckets(token), self._reserve(priority)
+        ) <= 0
+
+    def _buckets(self, token) -> list:
+        key = hashlib.blake2b(str(token).encode(), digest_size=8).hexdigest()
+        return [
+            self.global_bucket,
+            Bucket(f'token:{key}', self.token_rate, self.token_burst),
+        ]
+
+    def _reserve(self, priority) -> float:
+        return 0 if priority == INTERACTIVE else self.reserve
+
+
+def limited(handler, limiter, token_of, priority=BACKGROUND):
+    """Оборачивает обработчик стадии: запрос идет только после acquire."""
+    def inner(item):
+        """inner."""
+        limiter.acquire(token_of(item), priority)
+        return handler(item)
+    return inner
@@ -0,0 +1,147 @@
+import threading
+import time
+
+SCHEDULER_TICK: float = 1.0
+WHEEL_BITS: int = 6
+WHEEL_LEVELS: int = 4
+
+
+class Timer:
+    """Таймер колеса: ключ, тик срабатывания и полезная нагрузка."""
+
+    __slots__ = ('key', 'expires', 'payload', 'bucket')
+
+    def __init__(self, key, expires, payload):
+        self.key = key
+        self.expires = expires
+        self.payload = payload
+        self.bucket = None
+
+
+class TimingWheel:
+    """
+    Иерархическое колесо таймеров.
+    Уровень L делит время на слоты по 2 ** (WHEEL_BITS * L) тиков.
+    Таймер кладется в самый мелкий уровень, куда помещается его срок,
+    и спускается на уровень ниже, когда время доходит до его слота.
+    Постановка, отмена и перенос таймера выполняются за O(1),
+    а работа на тик не зависит от общего числа таймеров.
+
+    Время считается от момента создания колеса, а не от числа
+    вызовов advance, поэтому опоздания цикла не накапливаются:
+    пропущенные тики обрабатываются при следующем вызове.
+    """
+
+    def __init__(self, tick=SCHEDULER_TICK, bits=WHEEL_BITS,
+                 levels=WHEEL_LEVELS, clock=time.monotonic):
+        self.tick = tick
+        self.bits = bits
+        self.levels = levels
+        self.slots = 1 << bits
+        self.mask = self.slots - 1
+        self.clock = clock
+        self.started = clock()
+        self.current = 0
+        self.wheels = [
+            [{} for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self.timers = {}
+        self.max_lag = 0.0
+        self.lock = threading.Lock()
+
+    def schedule(self, key, delay, payload=None) -> None:
+        """Ставит (или переносит) таймер key через delay секунд."""
+        with self.lock:
+            self._remove(key)
+            elapsed = self.clock() - self.started
+            expires = max(
+                self.current + 1, -int(-(elapsed + delay) // self.tick)
+            )
+            timer = Timer(key, expires, payload)
+            self.timers[key] = timer
+            self._insert(timer)
+
+    def cancel(self, key) -> bool:
+        """Отменяет таймер; возвращает False, если его не было."""
+        with self.lock:
+            return self._remove(key)
+
+    def due(self, key):
+        """Возвращает время до срабатывания таймера или None."""
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                return None
+            moment = self.started + timer.expires * self.tick
+            return max(0.0, moment - self.clock())
+
+    def __len__(self):
+        return len(self.timers)
+
+    def __contains__(self, key):
+        return key in self.timers
+
+    def advance(self) -> list:
+        """
+        Обрабатывает все тики до текущего момента.
+        Возвращает полезные нагрузки сработавших таймеров.
+        """
+        with self.lock:
+            lag = self.clock() - self.started - self.current * self.tick
+            target = self.current + int(lag // self.tick)
+            self.max_lag = max(self.max_lag, lag - self.tick)
+            fired = []
+            while self.current < target:
+                self.current += 1
+                self._cascade()
+                bucket = self.wheels[0][self.current & self.mask]
+                for timer in bucket.values():
+                    timer.bucket = None
+                    del self.timers[timer.key]
+                    fired.append(timer.payload)
+                bucket.clear()
+            return fired
+
+    def sleep_time(self) -> float:
+        """Возвращает время до начала следующего тика."""
+        boundary = self.started + (self.current + 1) * self.tick
+        return max(0.0, boundary - self.clock())
+
+    def _cascade(self) -> None:
+        for level in range(1, self.levels):
+            shift = self.bits * level
+            if self.current & ((1 << shift) - 1):
+                return
+            index = (self.current >> shift) & self.mask
+            bucket = self.wheels[level][index]
+            self.wheels[level][index] = {}
+            for timer in bucket.values():
+                self._insert(timer)
+
+    def _insert(self, timer) -> None:
+        delta = timer.expires - self.current
+        for level in range(self.levels):
+            if delta < 1 << (self.bits * (level + 1)):
+                break
+        else:
+            level = self.levels - 1
+            shift = self.bits * level
+            bucket = self.wheels[level][
+                ((self.current >> shift) - 1) & self.mask
+            ]
+            bucket[timer.key] = timer
+            timer.bucket = bucket
+            return
+        shift = self.bits * level
+        bucket = self.wheels[level][(timer.expires >> shift) & self.mask]
+        bucket[timer.key] = timer
+        timer.bucket = bucket
+
+    def _remove(self, key) -> bool:
+        timer = self.timers.pop(key, None)
+        if timer is None:
+            return False
+        if timer.bucket is not None:
+            del timer.bucket[timer.key]
+            timer.bucket = None
+        return True
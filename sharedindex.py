@@ -0,0 +1,250 @@
+import fcntl
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+from dedupe import digest
+from eventlog import STATUS_CODES
+
+INDEX_SLOTS: int = 1 << 16
+INDEX_STRIPES: int = 64
+MAX_PROBE: int = 16
+READ_RETRIES: int = 1000
+ATTACH_TIMEOUT: float = 5.0
+# Код статуса, снятого после неудачной доставки уведомления.
+RELEASED: int = 0
+
+MAGIC = b'HWINDEX1'
+HEADER = struct.Struct('<8sQ')
+# Слот: счетчик версии (seqlock), код статуса, ключ, время записи.
+SEQUENCE = struct.Struct('<I')
+PAYLOAD = struct.Struct('<IQd')
+SLOT_SIZE = SEQUENCE.size + PAYLOAD.size
+
+
+def value_code(value) -> int:
+    """Код статуса из STATUS_CODES или crc32 произвольного значения."""
+    code = STATUS_CODES.get(value)
+    if code is not None:
+        return code
+    return zlib.crc32(str(value).encode()) | 0x100
+
+
+def lock_path(name) -> str:
+    """Путь к файлу fcntl-блокировок индекса."""
+    return os.path.join(tempfile.gettempdir(), f'{name}.lock')
+
+
+def _segment(name, create, size):
+    segment = shared_memory.SharedMemory(name, create=create, size=size)
+    # Сегмент живет дольше любого из процессов, поэтому снимаем его
+    # с учета resource_tracker, который иначе удалит его при выходе.
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+class SharedStatusIndex:
+    """
+    Индекс последних статусов в разделяемой памяти хоста.
+    Ключ (тенант, работа) -> код статуса и время записи.
+    Таблица фиксированного размера с открытой адресацией,
+    поэтому память не зависит от числа процессов воркера.
+
+    Чтение не берет блокировок: каждый слот защищен счетчиком
+    версии (seqlock), читатель повторяет чтение, если слот
+    менялся во время чтения. Запись блокирует только полосу
+    слотов: блокировка потока внутри процесса и fcntl-блокировка
+    байта полосы в файле между процессами.
+
+    Если слот не удалось прочитать за READ_RETRIES попыток, читатель
+    берет блокировку полосы. fcntl-блокировку умершего процесса
+    снимает ядро, и нечетный счетчик под блокировкой означает,
+    что писатель умер посреди записи: слот восстанавливается
+    с кодом RELEASED.
+
+    Если в окне MAX_PROBE слотов нет места, вытесняется самая старая
+    запись окна; для вытесненного ключа возможен один повтор.
+
+    Процесс, получивший от is_new право отправить уведомление,
+    при неудачной отправке возвращает его через release,
+    и смена статуса будет заново выдана при следующем опросе.
+    """
+
+    def __init__(self, name, slots=INDEX_SLOTS, stripes=INDEX_STRIPES,
+                 clock=time.time):
+        self.name = name
+        self.stripes = stripes
+        self.clock = clock
+        size = HEADER.size + slots * SLOT_SIZE
+        try:
+            self.segment = _segment(name, True, size)
+            HEADER.pack_into(self.segment.buf, 0, MAGIC, slots)
+        except FileExistsError:
+            self.segment = _segment(name, False, 0)
+            slots = self._wait_header()
+        self.slots = slots
+        self.buf = self.segment.buf
+        self.lock_file = open(lock_path(name), 'a+b')
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def _wait_header(self) -> int:
+        deadline = time.monotonic() + ATTACH_TIMEOUT
+        while True:
+            magic, slots = HEADER.unpack_from(self.segment.buf, 0)
+            if magic == MAGIC:
+                return slots
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f'Сегмент {self.name} не является индексом статусов'
+                )
+            time.sleep(0.01)
+
+    def lookup(self, key):
+        """Возвращает (код статуса, время записи) или None."""
+        key = self._key(key)
+        for slot in self._probe(key):
+            stored, code, moment = self._read(slot)
+            if stored == key:
+                return code, moment
+            if stored == 0:
+                return None
+        return None
+
+    def is_new(self, key, value) -> bool:
+        """
+        Проверяет, отличается ли значение от запомненного для ключа.
+        Новое значение запоминается; из нескольких процессов,
+        одновременно увидевших одно изменение, True получает один.
+        """
+        code = value_code(value)
+        found = self.lookup(key)
+        if found is not None and found[0] == code:
+            return False
+        return self._store(self._key(key), code)
+
+    def release(self, key, value) -> None:
+        """
+        Снимает значение, запомненное is_new, если уведомление
+        о нем не доставлено. Ключ остается в таблице с кодом RELEASED,
+        поэтому следующий is_new с тем же значением вернет True.
+        Значение, уже замененное другим процессом, не трогается.
+        """
+        code = value_code(value)
+        key = self._key(key)
+        for slot in self._probe(key):
+            stored, _, _ = self._read(slot)
+            if stored == 0:
+                return
+            if stored != key:
+                continue
+            with self._locked(slot):
+                stored, stored_code, _ = self._read_locked(slot)
+                if stored == key and stored_code == code:
+                    self._write(slot, key, RELEASED)
+            return
+
+    def close(self) -> None:
+        """Отключается от сегмента; данные остаются для других процессов."""
+        self.buf = None
+        self.segment.close()
+        self.lock_file.close()
+
+    def unlink(self) -> None:
+        """Удаляет сегмент и файл блокировок, когда индекс больше не нужен."""
+        shared_memory.SharedMemory(self.name).unlink()
+        try:
+            os.remove(lock_path(self.name))
+        except FileNotFoundError:
+            pass
+
+    def _key(self, key) -> int:
+        return int.from_bytes(digest(key, 8), 'little') or 1
+
+    def _probe(self, key):
+        start = key % self.slots
+        return [(start + step) % self.slots for step in range(MAX_PROBE)]
+
+    def _offset(self, slot) -> int:
+        return HEADER.size + slot * SLOT_SIZE
+
+    def _read(self, slot):
+        offset = self._offset(slot)
+        for _ in range(READ_RETRIES):
+            entry = self._try_read(offset)
+            if entry is not None:
+                return entry
+        with self._locked(slot):
+            return self._read_locked(slot)
+
+    def _read_locked(self, slot):
+        offset = self._offset(slot)
+        sequence = SEQUENCE.unpack_from(self.buf, offset)[0]
+        if sequence & 1:
+            _, key, _ = PAYLOAD.unpack_from(self.buf, offset + SEQUENCE.size)
+            PAYLOAD.pack_into(
+                self.buf, offset + SEQUENCE.size, RELEASED, key, self.clock()
+            )
+            SEQUENCE.pack_into(self.buf, offset, (sequence + 1) & 0xFFFFFFFF)
+        return self._try_read(offset)
+
+    def _try_read(self, offset):
+        before = SEQUENCE.unpack_from(self.buf, offset)[0]
+        if before & 1:
+            return None
+        code, key, moment = PAYLOAD.unpack_from(
+            self.buf, offset + SEQUENCE.size
+        )
+        if SEQUENCE.unpack_from(self.buf, offset)[0] != before:
+            return None
+        return key, code, moment
+
+    def _write(self, slot, key, code) -> None:
+        offset = self._offset(slot)
+        sequence = SEQUENCE.unpack_from(self.buf, offset)[0]
+        SEQUENCE.pack_into(self.buf, offset, (sequence + 1) & 0xFFFFFFFF)
+        PAYLOAD.pack_into(
+            self.buf, offset + SEQUENCE.size, code, key, self.clock()
+        )
+        SEQUENCE.pack_into(self.buf, offset, (sequence + 2) & 0xFFFFFFFF)
+
+    def _store(self, key, code) -> bool:
+        while True:
+            oldest = None
+            for slot in self._probe(key):
+                stored, stored_code, moment = self._read(slot)
+                if stored in (key, 0):
+                    break
+                if oldest is None or moment < oldest[1]:
+                    oldest = (slot, moment)
+            else:
+                slot = oldest[0]
+            with self._locked(slot):
+                stored, stored_code, moment = self._read_locked(slot)
+                if stored == key:
+                    if stored_code == code:
+                        return False
+                elif stored != 0 and (slot, moment) != oldest:
+                    continue
+                self._write(slot, key, code)
+                return True
+
+    def _locked(self, slot):
+        return _StripeLock(self, slot % self.stripes)
+
+
+class _StripeLock:
+    def __init__(self, index, stripe):
+        self.index = index
+        self.stripe = stripe
+
+    def __enter__(self):
+        self.index.locks[self.stripe].acquire()
+        fcntl.lockf(self.index.lock_file, fcntl.LOCK_EX, 1, self.stripe)
+
+    def __exit__(self, *args):
+        fcntl.lockf(self.index.lock_file, fcntl.LOCK_UN, 1, self.stripe)
+        self.index.locks[self.stripe].release()
@@ -0,0 +1,293 @@
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from http import HTTPStatus
+from unittest import mock
+
+import requests
+import telegram
+
+import homework
+from ratelimit import RateLimiter
+
+SOAK_CYCLES: int = 1_000_000
+SAMPLE_EVERY: int = 10_000
+WARMUP: float = 0.2
+UNLIMITED: float = 1e12
+
+# Допустимый рост метрики за прогон после прогрева:
+# (абсолютный, доля от среднего) — берется больший из двух.
+TOLERANCES = {
+    'rss': (8 * 1024 * 1024, 0.1),
+    'traced': (512 * 1024, 0.1),
+    'fds': (0.5, 0),
+    'threads': (0.5, 0),
+    'cpu': (0, 0.5),
+}
+
+# Исходы циклов по кругу: каждый путь ошибки exceptions.py
+# и ошибки валидации ответа встречаются в каждом круге.
+OUTCOMES = (
+    'ok', 'status_code', 'ok', 'connection', 'ok', 'timeout',
+    'ok', 'unknown_status', 'ok', 'malformed', 'telegram_error',
+)
+
+Sample = namedtuple(
+    'Sample', ('cycle', 'rss', 'traced', 'fds', 'threads', 'cpu')
+)
+Trend = namedtuple('Trend', ('metric', 'growth', 'allowed', 'ok'))
+
+
+class StopSoak(Exception):
+    """Останавливает цикл main() после заданного числа циклов."""
+
+
+class Scenario:
+    """Определяет исход текущего цикла и считает исходы."""
+
+    def __init__(self):
+        self.cycle = 0
+        self.outcomes = Counter()
+
+    @property
+    def kind(self) -> str:
+        """Исход текущего цикла."""
+        return OUTCOMES[self.cycle % len(OUTCOMES)]
+
+
+class StubResponse:
+    """Ответ заглушки API Практикума."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        """Возвращает тело ответа."""
+        return self.payload
+
+
+class StubPracticum:
+    """Заглушка requests.get для API Практикума."""
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+
+    def __call__(self, url, headers=None, params=None, timeout=None):
+        """Отвечает согласно исходу текущего цикла."""
+        kind = self.scenario.kind
+        self.scenario.outcomes[kind] += 1
+        if kind == 'connection':
+            raise requests.ConnectionError('connection reset')
+        if kind == 'timeout':
+            raise requests.Timeout('read timed out')
+        if kind == 'status_code':
+            return StubResponse(HTTPStatus.INTERNAL_SERVER_ERROR, {})
+        if kind == 'malformed':
+            return StubResponse(HTTPStatus.OK, {'homeworks': None})
+        verdicts = list(homework.HOMEWORK_VERDICTS)
+        status = verdicts[self.scenario.cycle % len(verdicts)]
+        if kind == 'unknown_status':
+            status = 'lost'
+        return StubResponse(HTTPStatus.OK, {
+            'homeworks': [{'homework_name': 'soak.zip', 'status': status}],
+            'current_date': params['from_date'],
+        })
+
+
+class StubBot:
+    """Заглушка telegram.Bot."""
+
+    def __init__(self, scenario, token=None):
+        self.scenario = scenario
+        self.sent = 0
+
+    def send_message(self, chat_id, text):
+        """Принимает сообщение или падает в цикле telegram_error."""
+        if self.scenario.kind == 'telegram_error':
+            raise telegram.error.NetworkError('flood control')
+        self.sent += 1
+
+
+def open_fds():
+    """Возвращает число открытых дескрипторов или None вне Linux."""
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def resident_memory():
+    """Возвращает RSS процесса в байтах."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def take_sample(cycle) -> Sample:
+    """Снимает показатели процесса."""
+    return Sample(
+        cycle, resident_memory(), tracemalloc.get_traced_memory()[0],
+        open_fds(), threading.active_count(), time.process_time()
+    )
+
+
+def slope(xs, ys) -> float:
+    """Наклон прямой наименьших квадратов."""
+    count = len(xs)
+    mean_x = sum(xs) / count
+    mean_y = sum(ys) / count
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum(
+        (x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)
+    ) / spread
+
+
+def check_trends(samples, warmup=WARMUP, tolerances=TOLERANCES) -> list:
+    """
+    Проверяет, что показатели не растут после прогрева.
+    Рост — наклон прямой по выборкам, умноженный на длину прогона.
+    CPU проверяется как время на цикл между соседними выборками.
+    """
+    samples = samples[int(len(samples) * warmup):]
+    if len(samples) < 3:
+        return []
+    series = {
+        metric: [getattr(sample, metric) for sample in samples]
+        for metric in ('rss', 'traced', 'fds', 'threads')
+    }
+    series['cpu'] = [
+        (current.cpu - previous.cpu) / (current.cycle - previous.cycle)
+        for previous, current in zip(samples, samples[1:])
+    ]
+    cycles = [sample.cycle for sample in samples]
+    trends = []
+    for metric, values in series.items():
+        if None in values:
+            continue
+        xs = cycles[-len(values):]
+        growth = slope(xs, values) * (xs[-1] - xs[0])
+        absolute, relative = tolerances[metric]
+        allowed = max(absolute, relative * abs(sum(values) / len(values)))
+        trends.append(Trend(metric, growth, allowed, growth <= allowed))
+    return trends
+
+
+SoakResult = namedtuple(
+    'SoakResult', ('cycles', 'samples', 'trends', 'outcomes', 'errors')
+)
+
+
+def unlimited_limiter() -> RateLimiter:
+    """Ограничитель частоты, который никогда не заставляет ждать."""
+    return RateLimiter(
+        rate=UNLIMITED, burst=UNLIMITED,
+        token_rate=UNLIMITED, token_burst=UNLIMITED
+    )
+
+
+def patch_loop(stack, get, bot_factory, sleep, report_error) -> None:
+    """
+    Подменяет внешние зависимости homework.main() на время stack.
+    get заменяет requests.get, bot_factory — telegram.Bot,
+    sleep — time.sleep, report_error — обработчик сбоев конвейера.
+    """
+    for name, value in (
+        ('PRACTICUM_TOKEN', 'stub'),
+        ('TELEGRAM_TOKEN', 'stub'),
+        ('TELEGRAM_CHAT_ID', 'stub'),
+        ('report_error', report_error),
+        ('build_limiter', unlimited_limiter),
+    ):
+        stack.enter_context(mock.patch.object(homework, name, value))
+    stack.enter_context(mock.patch.object(homework.requests, 'get', get))
+    stack.enter_context(
+        mock.patch.object(homework.telegram, 'Bot', bot_factory)
+    )
+    stack.enter_context(mock.patch.object(homework.time, 'sleep', sleep))
+
+
+def run(cycles=SOAK_CYCLES, sample_every=SAMPLE_EVERY) -> SoakResult:
+    """
+    Прогоняет настоящий цикл homework.main() cycles раз.
+    API Практикума, Telegram и time.sleep заменены заглушками,
+    ограничитель частоты не ограничивает. Журнал на время прогона
+    отключается, чтобы миллионы строк ошибок не шли в stderr.
+    """
+    scenario = Scenario()
+    errors = Counter()
+    samples = []
+    report_error = homework.report_error
+
+    def counted_report_error(error, aggregator):
+        errors[type(error).__name__] += 1
+        report_error(error, aggregator)
+
+    def sleep(seconds):
+        scenario.cycle += 1
+        if scenario.cycle % sample_every == 0:
+            samples.append(take_sample(scenario.cycle))
+        if scenario.cycle >= cycles:
+            raise StopSoak
+
+    tracemalloc.start()
+    logging.disable(logging.CRITICAL)
+    try:
+        with ExitStack() as stack:
+            patch_loop(
+                stack, StubPracticum(scenario),
+                lambda token: StubBot(scenario, token),
+                sleep, counted_report_error
+            )
+            try:
+                homework.main()
+            except StopSoak:
+                pass
+    finally:
+        logging.disable(logging.NOTSET)
+        tracemalloc.stop()
+    return SoakResult(
+        scenario.cycle, samples, check_trends(samples),
+        scenario.outcomes, errors
+    )
+
+
+def report(result) -> str:
+    """Готовит текстовый отчет о прогоне."""
+    lines = [f'Циклов: {result.cycles}, выборок: {len(result.samples)}']
+    lines.append('Исходы: ' + ', '.join(
+        f'{kind}={count}' for kind, count in sorted(result.outcomes.items())
+    ))
+    lines.append('Ошибки: ' + ', '.join(
+        f'{name}={count}' for name, count in sorted(result.errors.items())
+    ))
+    for trend in result.trends:
+        verdict = 'ok' if trend.ok else 'РОСТ'
+        lines.append(
+            f'{trend.metric:8} рост {trend.growth:.6g} '
+            f'(допустимо {trend.allowed:.6g}) {verdict}'
+        )
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Длительный прогон цикла бота против заглушек.'
+    )
+    parser.add_argument('--cycles', type=int, default=SOAK_CYCLES)
+    parser.add_argument('--sample-every', type=int, default=SAMPLE_EVERY)
+    arguments = parser.parse_args()
+    result = run(arguments.cycles, arguments.sample_every)
+    print(report(result))
+    sys.exit(0 if all(trend.ok for trend in result.trends) else 1)
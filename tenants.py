@@ -0,0 +1,119 @@
+import json
+import os
+from collections import namedtuple
+
+Tenant = namedtuple(
+    'Tenant',
+    ('name', 'practicum_token', 'telegram_token', 'chat_id', 'period'),
+    defaults=(None,)
+)
+TenantDiff = namedtuple('TenantDiff', ('added', 'removed', 'modified'))
+
+
+def headers_of(token) -> dict:
+    """Возвращает заголовки запроса к API Практикума для токена."""
+    return {'Authorization': f'OAuth {token}'}
+
+
+def token_of(headers) -> str:
+    """Возвращает токен Практикума из заголовков запроса."""
+    return headers['Authorization'].removeprefix('OAuth ')
+
+
+def parse_tenant(item) -> Tenant:
+    """
+    Создает тенанта из объекта JSON.
+    Интервал опроса period должен быть положительным: при нуле
+    планировщик опрашивал бы тенанта на каждом тике.
+    """
+    period = item.get('period')
+    if period is not None:
+        period = int(period)
+        if period <= 0:
+            raise ValueError(
+                f'Интервал опроса тенанта {item["name"]} должен быть '
+                f'положительным: {period}'
+            )
+    return Tenant(
+        str(item['name']),
+        item['practicum_token'],
+        item['telegram_token'],
+        str(item['chat_id']),
+        period
+    )
+
+
+def config_files(path) -> list:
+    """Возвращает файлы конфигурации: сам файл или *.json каталога."""
+    if not os.path.isdir(path):
+        return [path]
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.endswith('.json')
+    ]
+
+
+def load_tenants(path) -> list:
+    """
+    Читает тенантов из JSON-файла или каталога JSON-файлов.
+    Файл содержит объект тенанта или список объектов с полями
+    name, practicum_token, telegram_token, chat_id
+    и необязательным period — интервалом опроса в секундах.
+    """
+    tenants = []
+    for name in config_files(path):
+        with open(name, encoding='utf-8') as file:
+            data = json.load(file)
+        if isinstance(data, dict) and os.path.isdir(path):
+            data = [data]
+        if not isinstance(data, list):
+            raise TypeError('Ожидаемый тип данных для списка тенантов: list')
+        tenants.extend(parse_tenant(item) for item in data)
+    names = [tenant.name for tenant in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError('Имена тенантов должны быть уникальными')
+    return tenants
+
+
+def diff_tenants(old, new) -> TenantDiff:
+    """Сравнивает два словаря тенантов по имени."""
+    return TenantDiff(
+        [tenant for name, tenant in new.items() if name not in old],
+        [tenant for name, tenant in old.items() if name not in new],
+        [
+            tenant for name, tenant in new.items()
+            if name in old and old[name] != tenant
+        ]
+    )
+
+
+class TenantRegistry:
+    """
+    Реестр тенантов из файла или каталога конфигурации.
+    reload перечитывает конфигурацию, только если изменились
+    размеры или времена изменения файлов, и возвращает разницу
+    с прошлой версией. Ошибка чтения не меняет текущих тенантов.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = None
+        self.tenants = {}
+
+    def reload(self):
+        """Возвращает TenantDiff или None, если файлы не менялись."""
+        signature = self._signature()
+        if signature == self.signature:
+            return None
+        self.signature = signature
+        tenants = {tenant.name: tenant for tenant in load_tenants(self.path)}
+        diff = diff_tenants(self.tenants, tenants)
+        self.tenants = tenants
+        return diff
+
+    def _signature(self):
+        files = config_files(self.path)
+        return tuple(
+            (name, stat.st_mtime_ns, stat.st_size)
+            for name, stat in ((name, os.stat(name)) for name in files)
+        )
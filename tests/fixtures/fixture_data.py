@@ -1,10 +1,29 @@
 import random
 import string
+import time
 from datetime import datetime
 
 import pytest
 
 
+class FakeClock:
+    """Часы теста: время меняется присваиванием now или через sleep."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
 @pytest.fixture
 def random_timestamp():
     left_ts = 1000198000
@@ -29,3 +48,13 @@ def random_message():
         letters = string.ascii_letters
         return ''.join(random.choice(letters) for _ in range(string_length))
     return random_string()
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    """Часовой пояс хоста, отличный от UTC."""
+    monkeypatch.setenv('TZ', 'Europe/Moscow')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,96 @@
+import pytest
+import requests
+
+from alerts import ErrorAggregator, fingerprint
+from exceptions import ResponseException, StatusCodeError
+
+
+def connection_error():
+    try:
+        requests.get('http://127.0.0.1:9/', timeout=1)
+    except requests.ConnectionError as error:
+        return ResponseException(error)
+    pytest.skip('Порт 9 неожиданно принял соединение')
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def aggregator(clock, sent):
+    return ErrorAggregator(
+        sent.append, window=60, escalation_factor=10, clock=clock
+    )
+
+
+class TestErrorAggregator:
+
+    def test_fingerprint_ignores_numbers(self):
+        assert fingerprint(TypeError('id 1674831185')) == (
+            fingerprint(TypeError('id 1674831999'))
+        ), 'Отпечаток не должен зависеть от чисел в сообщении.'
+        assert fingerprint(TypeError('x')) != fingerprint(ValueError('x'))
+
+    def test_fingerprint_merges_status_class(self):
+        assert fingerprint(StatusCodeError('Статус код: 500')) == (
+            fingerprint(StatusCodeError('Статус код: 502'))
+        ), 'Ошибки сервера 5xx склеиваются в одно оповещение.'
+
+    def test_fingerprint_splits_status_classes(self):
+        assert fingerprint(StatusCodeError('Статус код: 401')) != (
+            fingerprint(StatusCodeError('Статус код: 500'))
+        ), 'Неверный токен и сбой API — разные оповещения.'
+
+    def test_fingerprint_ignores_object_addresses(self):
+        first, second = connection_error(), connection_error()
+        assert str(first) != str(second), (
+            'Ошибки соединения должны различаться адресом объекта'
+        )
+        assert fingerprint(first) == fingerprint(second), (
+            'Повторные сбои соединения должны давать один отпечаток'
+        )
+
+    def test_repeats_send_single_alert(self, aggregator, sent):
+        for _ in range(9):
+            aggregator.register(StatusCodeError('Статус код: 500'))
+        assert len(sent) == 1, (
+            'Повторы одной ошибки не должны порождать новые оповещения.'
+        )
+        assert sent[0].startswith('Новая ошибка')
+
+    def test_escalation(self, aggregator, sent):
+        for _ in range(100):
+            aggregator.register(StatusCodeError('Статус код: 500'))
+        assert [text.split(':')[0] for text in sent] == [
+            'Новая ошибка', 'Ошибка повторяется', 'Ошибка повторяется'
+        ]
+
+    def test_clear_after_window(self, aggregator, sent, clock):
+        aggregator.register(TypeError('Отсутствуют данные'))
+        clock.now = 30
+        aggregator.flush()
+        assert len(sent) == 1
+        clock.now = 100
+        aggregator.flush()
+        assert sent[-1].startswith('Ошибка устранена')
+        assert aggregator.active() == {}
+
+    def test_notify_error_is_logged(self, clock):
+        def broken_notify(text):
+            raise RuntimeError('offline')
+
+        aggregator = ErrorAggregator(broken_notify, clock=clock)
+        aggregator.register(TypeError('x'))
+        assert aggregator.active()
+
+    def test_memory_does_not_depend_on_error_rate(self, aggregator, clock):
+        for step in range(10000):
+            clock.now = step / 100
+            aggregator.register(StatusCodeError('Статус код: 500'))
+        count = aggregator.active()['StatusCodeError: Статус код: 5xx']
+        assert 6000 <= count <= 6100, 'В окне — повторы последних 60 секунд.'
+        assert max(map(len, aggregator.events.values())) <= 61, (
+            'Повторы должны храниться по интервалам окна, а не поштучно.'
+        )
@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+import requests
+import telegram
+
+from concurrency import AdaptiveLimit, bounded
+from exceptions import (
+    ResponseException, StatusCodeError, TelegramSendMessageException
+)
+from homework import bounded_upstreams, deliver
+
+
+def call(limit, clock, latency, concurrent=None, dropped=False):
+    """Выполняет concurrent одновременных вызовов с задержкой latency."""
+    concurrent = concurrent or int(limit.limit)
+    started = [limit.acquire() for _ in range(concurrent)]
+    clock.now += latency
+    for moment in started:
+        limit.release(moment, dropped=dropped)
+
+
+class TestAdaptiveLimit:
+
+    def test_limit_grows_while_latency_is_stable(self, clock):
+        limit = AdaptiveLimit('api', 4, 16, clock=clock)
+        for _ in range(50):
+            call(limit, clock, 0.1)
+        assert limit.snapshot()['concurrency_limit'] == 16
+
+    def test_idle_limit_does_not_grow(self, clock):
+        limit = AdaptiveLimit('api', 4, 16, clock=clock)
+        for _ in range(50):
+            call(limit, clock, 0.1, concurrent=1)
+        assert limit.snapshot()['concurrency_limit'] == 4, (
+            'Неиспользуемый предел не должен расти.'
+        )
+
+    def test_limit_backs_off_on_latency(self, clock):
+        limit = AdaptiveLimit('api', 4, 16, clock=clock)
+        for _ in range(50):
+            call(limit, clock, 0.1)
+        for _ in range(20):
+            call(limit, clock, 1.0)
+        assert limit.snapshot()['concurrency_limit'] < 8
+
+    def test_limit_halves_on_overload(self, clock):
+        limit = AdaptiveLimit('api', 8, 16, clock=clock)
+        call(limit, clock, 0.1, dropped=True)
+        snapshot = limit.snapshot()
+        assert snapshot['concurrency_limit'] == 4, (
+            'Волна ошибок перегрузки должна снижать предел один раз.'
+        )
+        assert snapshot['overload_drops'] == 8
+        for _ in range(10):
+            call(limit, clock, 0.1, dropped=True)
+        assert limit.snapshot()['concurrency_limit'] == 1
+
+    def test_acquire_blocks_at_limit(self):
+        limit = AdaptiveLimit('api', 1, 1)
+        started = limit.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (limit.acquire(), acquired.set())
+        )
+        thread.start()
+        assert not acquired.wait(0.1), 'Вызов сверх предела должен ждать.'
+        limit.release(started)
+        assert acquired.wait(1)
+        thread.join()
+
+
+def test_bounded_classifies_errors(clock):
+    limit = AdaptiveLimit('api', 2, 4, clock=clock)
+
+    def handler(item):
+        if item == 'timeout':
+            raise TimeoutError(item)
+        if item == 'invalid':
+            raise ValueError(item)
+        return item
+
+    wrapped = bounded(handler, limit, TimeoutError)
+    assert wrapped('ok') == 'ok'
+    with pytest.raises(ValueError):
+        wrapped('invalid')
+    assert limit.snapshot()['overload_drops'] == 0
+    with pytest.raises(TimeoutError):
+        wrapped('timeout')
+    snapshot = limit.snapshot()
+    assert snapshot['overload_drops'] == 1
+    assert snapshot['concurrency_inflight'] == 0
+    assert snapshot['concurrency_limit'] == 1
+
+
+def test_only_practicum_overload_shrinks_limit(clock):
+    limit = AdaptiveLimit('practicum', 4, 8, clock=clock)
+    errors = {
+        'unauthorized': StatusCodeError('Статус код: 401', 401),
+        'reset': ResponseException(),
+        'throttled': StatusCodeError('Статус код: 429', 429),
+    }
+    timeout = requests.Timeout('read timed out')
+    try:
+        raise ResponseException(timeout) from timeout
+    except ResponseException as error:
+        errors['timeout'] = error
+
+    def handler(item):
+        raise errors[item]
+
+    fetch, _ = bounded_upstreams(
+        handler, None, {'practicum': limit, 'telegram': None}
+    )
+    for _ in range(5):
+        with pytest.raises(StatusCodeError):
+            fetch('unauthorized')
+    with pytest.raises(ResponseException):
+        fetch('reset')
+    assert limit.snapshot()['concurrency_limit'] == 4, (
+        'Неверный токен одного тенанта не должен снижать общий предел.'
+    )
+    with pytest.raises(StatusCodeError):
+        fetch('throttled')
+    with pytest.raises(ResponseException):
+        fetch('timeout')
+    assert limit.snapshot()['overload_drops'] == 2
+
+
+def test_only_telegram_overload_shrinks_limit(clock):
+    limit = AdaptiveLimit('telegram', 4, 8, clock=clock)
+    causes = {
+        'unauthorized': telegram.error.Unauthorized('Unauthorized'),
+        'rejected': telegram.error.BadRequest('Chat not found'),
+        'flood': telegram.error.RetryAfter(5),
+        'timeout': telegram.error.TimedOut(),
+        'network': telegram.error.NetworkError('Connection reset'),
+    }
+
+    class Bot:
+        def send_message(self, chat_id, text):
+            raise causes[text]
+
+    _, send = bounded_upstreams(
+        None, lambda text: deliver(Bot(), 1, text),
+        {'practicum': None, 'telegram': limit}
+    )
+    for _ in range(5):
+        for item in ('unauthorized', 'rejected'):
+            with pytest.raises(TelegramSendMessageException):
+                send(item)
+    assert limit.snapshot()['concurrency_limit'] == 4, (
+        'Неверный токен и отклоненное сообщение '
+        'не должны снижать предел Telegram.'
+    )
+    for item in ('flood', 'timeout', 'network'):
+        with pytest.raises(TelegramSendMessageException):
+            send(item)
+    assert limit.snapshot()['overload_drops'] == 3
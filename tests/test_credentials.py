@@ -0,0 +1,127 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+import requests
+import telegram
+
+import credentials
+from credentials import INVALID, OK, UNKNOWN, validate_tenants
+from ratelimit import INTERACTIVE
+from tenants import Tenant, load_tenants
+
+BAD_PRACTICUM = 'bad-practicum'
+BAD_BOT = 'bad-bot'
+DOWN_BOT = 'down-bot'
+MISSING_CHAT = 'missing-chat'
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeBot:
+    def __init__(self, token=None, **kwargs):
+        self.token = token
+
+    def get_me(self, **kwargs):
+        time.sleep(0.05)
+        if self.token == BAD_BOT:
+            raise telegram.error.Unauthorized('Unauthorized')
+        if self.token == DOWN_BOT:
+            raise telegram.error.NetworkError('Bad Gateway')
+
+    def get_chat(self, chat_id, **kwargs):
+        if chat_id == MISSING_CHAT:
+            raise telegram.error.BadRequest('Chat not found')
+
+
+@pytest.fixture
+def fake_upstreams(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_get(url, headers=None, **kwargs):
+        with lock:
+            calls.append(headers['Authorization'])
+        time.sleep(0.05)
+        if headers['Authorization'] == f'OAuth {BAD_PRACTICUM}':
+            return FakeResponse(HTTPStatus.UNAUTHORIZED)
+        return FakeResponse(HTTPStatus.OK)
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    monkeypatch.setattr(telegram, 'Bot', FakeBot)
+    return calls
+
+
+class TestValidateTenants:
+
+    def test_report_and_quarantine(self, fake_upstreams):
+        tenants = [
+            Tenant('ok', 'p1', 'b1', 'c1'),
+            Tenant('bad_practicum', BAD_PRACTICUM, 'b1', 'c1'),
+            Tenant('bad_bot', 'p1', BAD_BOT, 'c1'),
+            Tenant('bad_chat', 'p1', 'b1', MISSING_CHAT),
+            Tenant('telegram_down', 'p1', DOWN_BOT, 'c1'),
+        ]
+        report = validate_tenants(tenants)
+        states = {check.tenant.name: check.state for check in report.checks}
+        assert states == {
+            'ok': OK,
+            'bad_practicum': INVALID,
+            'bad_bot': INVALID,
+            'bad_chat': INVALID,
+            'telegram_down': UNKNOWN,
+        }
+        assert [tenant.name for tenant in report.valid] == [
+            'ok', 'telegram_down'
+        ], 'Временный сбой проверки не должен отправлять тенант в карантин.'
+        assert report.summary() == {OK: 1, INVALID: 3, UNKNOWN: 1}
+        assert sorted(fake_upstreams) == ['OAuth bad-practicum', 'OAuth p1'], (
+            'Одинаковые токены должны проверяться один раз.'
+        )
+
+    def test_probes_run_concurrently(self, fake_upstreams):
+        tenants = [
+            Tenant(str(number), f'p{number}', f'b{number}', 'c')
+            for number in range(64)
+        ]
+        started = time.monotonic()
+        report = validate_tenants(tenants, max_workers=64)
+        assert len(report.valid) == 64
+        assert time.monotonic() - started < 0.05 * 64
+
+    def test_practicum_probes_are_rate_limited(self, fake_upstreams):
+        class FakeLimiter:
+            def __init__(self):
+                self.acquired = []
+
+            def acquire(self, token, priority):
+                self.acquired.append((token, priority))
+
+        limiter = FakeLimiter()
+        validate_tenants(
+            [Tenant('a', 'p1', 'b1', 'c1'), Tenant('b', 'p2', 'b1', 'c1')],
+            limiter=limiter
+        )
+        assert sorted(limiter.acquired) == [
+            ('p1', INTERACTIVE), ('p2', INTERACTIVE)
+        ], 'Пробный запрос должен проходить через ограничитель вне очереди.'
+
+    def test_network_error(self, monkeypatch):
+        def broken_get(*args, **kwargs):
+            raise requests.ConnectionError('reset')
+
+        monkeypatch.setattr(requests, 'get', broken_get)
+        assert credentials.probe_practicum('p').state == UNKNOWN
+
+
+def test_load_tenants(tmp_path):
+    path = tmp_path / 'tenants.json'
+    path.write_text(
+        '[{"name": "a", "practicum_token": "p", '
+        '"telegram_token": "b", "chat_id": 1}]'
+    )
+    assert load_tenants(str(path)) == [Tenant('a', 'p', 'b', '1')]
@@ -0,0 +1,67 @@
+import tracemalloc
+
+import pytest
+
+from dedupe import ENTRY_SIZE, DedupeCache
+
+
+class TestDedupeCache:
+
+    def test_repeated_value_is_not_new(self):
+        cache = DedupeCache()
+        assert cache.is_new('tenant', 'approved')
+        assert not cache.is_new('tenant', 'approved'), (
+            'Повторное значение не должно считаться новым.'
+        )
+        assert cache.is_new('tenant', 'rejected')
+        assert cache.stats()['hits'] == 1
+
+    def test_lru_eviction(self):
+        cache = DedupeCache(max_bytes=ENTRY_SIZE * 2)
+        cache.is_new('a', 1)
+        cache.is_new('b', 1)
+        cache.is_new('a', 1)
+        cache.is_new('c', 1)
+        assert cache.stats()['evictions'] == 1
+        assert not cache.is_new('a', 1)
+        assert cache.is_new('b', 1), 'Вытесняться должен самый старый ключ.'
+
+    def test_release(self):
+        cache = DedupeCache()
+        assert cache.is_new('tenant', 'approved')
+        cache.release('tenant', 'approved')
+        assert cache.is_new('tenant', 'approved'), (
+            'Снятое значение должно снова считаться новым.'
+        )
+        cache.release('tenant', 'rejected')
+        assert not cache.is_new('tenant', 'approved')
+
+    def test_ttl(self, clock):
+        cache = DedupeCache(ttl=10, clock=clock)
+        cache.is_new('a', 1)
+        clock.now = 11
+        assert cache.is_new('a', 1)
+        assert cache.stats()['expirations'] == 1
+
+    @pytest.mark.parametrize('bloom', [False, True])
+    def test_memory_is_bounded(self, bloom):
+        max_bytes = 64 * 1024
+        cache = DedupeCache(max_bytes=max_bytes, bloom=bloom)
+        tracemalloc.start()
+        for tenant in range(5000):
+            cache.is_new(f'tenant-{tenant}', 'reviewing')
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        stats = cache.stats()
+        assert stats['size'] == stats['capacity']
+        assert used < max_bytes * 2, (
+            'Кэш не должен расти сверх заданного объема памяти.'
+        )
+
+    def test_bloom_skips_unseen_keys(self):
+        cache = DedupeCache(bloom=True)
+        for tenant in range(100):
+            assert cache.is_new(tenant, 'approved')
+        assert cache.stats()['bloom_skips'] >= 90
+        for tenant in range(100):
+            assert not cache.is_new(tenant, 'approved')
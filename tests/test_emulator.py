@@ -0,0 +1,124 @@
+import time
+
+import pytest
+import requests
+
+import homework
+from credentials import INVALID, PROBE_OK, probe_practicum
+from emulator import API_PATH, Emulator, Throttle, Timelines, serve
+from exceptions import StatusCodeError
+from homework import HOMEWORK_VERDICTS
+from tests.fixtures.fixture_data import FakeClock
+
+
+@pytest.fixture
+def emulator():
+    return Emulator(Timelines(time.time(), tokens=100))
+
+
+@pytest.fixture
+def url(emulator):
+    port, stop = serve(emulator, 0)
+    yield f'http://127.0.0.1:{port}{API_PATH}'
+    stop()
+
+
+def auth(token):
+    return {'Authorization': f'OAuth {token}'}
+
+
+class TestEmulator:
+
+    def test_requires_oauth(self, url):
+        assert requests.get(url).status_code == 401
+        assert requests.get(url, headers=auth('token-100')).status_code == 401
+        response = requests.get(url, headers={'Authorization': 'token-1'})
+        assert response.status_code == 401
+
+    def test_statuses(self, url):
+        response = requests.get(
+            url, headers=auth('token-7'), params={'from_date': 0}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert abs(data['current_date'] - time.time()) < 5
+        assert data['homeworks'], 'У токена должна быть история работ.'
+        dates = [homework['date_updated'] for homework in data['homeworks']]
+        assert dates == sorted(dates, reverse=True), (
+            'Самая свежая работа должна идти первой.'
+        )
+        for record in data['homeworks']:
+            assert record['status'] in HOMEWORK_VERDICTS
+
+    def test_from_date(self, url):
+        response = requests.get(
+            url, headers=auth('token-7'),
+            params={'from_date': int(time.time()) + 1}
+        )
+        assert response.json()['homeworks'] == []
+        response = requests.get(
+            url, headers=auth('token-7'), params={'from_date': 'yesterday'}
+        )
+        assert response.status_code == 400
+
+    def test_keep_alive(self, url):
+        with requests.Session() as session:
+            for number in range(20):
+                response = session.get(
+                    url, headers=auth(f'token-{number}'),
+                    params={'from_date': 0}
+                )
+                assert response.status_code == 200
+
+    def test_latency(self, url, emulator):
+        emulator.latency = 0.2
+        started = time.monotonic()
+        requests.get(url, headers=auth('token-1'))
+        assert time.monotonic() - started >= 0.2
+
+    def test_homework_client(self, url, monkeypatch):
+        monkeypatch.setattr(homework, 'ENDPOINT', url)
+        response = homework.request_statuses(auth('token-3'), 0)
+        assert homework.check_response(response).valid
+        with pytest.raises(StatusCodeError):
+            homework.request_statuses(auth('unknown'), 0)
+
+    def test_credentials_probe(self, url, monkeypatch):
+        monkeypatch.setattr(homework, 'ENDPOINT', url)
+        assert probe_practicum('token-3') == PROBE_OK, (
+            'Проверка токена должна идти на текущий ENDPOINT.'
+        )
+        assert probe_practicum('unknown').state == INVALID
+
+
+def test_timelines_move_forward():
+    timelines = Timelines(time.time(), tokens=10)
+    statuses = [
+        [event[:2] for event in timelines.history(f'token-{number}')]
+        for number in range(10)
+    ]
+    assert statuses == [
+        [event[:2] for event in Timelines(
+            timelines.epoch, tokens=10
+        ).history(f'token-{number}')]
+        for number in range(10)
+    ], 'История токена должна быть детерминированной.'
+    assert any(
+        moment > timelines.epoch
+        for history in statuses for moment, _ in history
+    ), 'Часть смен статусов должна происходить после запуска.'
+
+
+def test_throttle_and_errors():
+    clock = FakeClock()
+    emulator = Emulator(
+        Timelines(time.time(), tokens=10),
+        throttle=Throttle(rate=1, burst=2, clock=clock)
+    )
+    path = f'{API_PATH}?from_date=0'
+    codes = [emulator.handle(path, 'OAuth token-1')[0] for _ in range(3)]
+    assert codes == [200, 200, 429]
+    clock.now += 1
+    assert emulator.handle(path, 'OAuth token-1')[0] == 200
+    emulator.error_rate = 1
+    assert emulator.handle(path, 'OAuth token-2')[0] == 500
@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+import pytest
+
+from eventlog import (
+    STATUS_CODES, EventLog, dwell_by_status, load_columns, report,
+    throughput_by_hour, transition_percentiles
+)
+
+HOUR = 3600
+
+
+@pytest.fixture
+def log(tmp_path):
+    event_log = EventLog(str(tmp_path / 'events'), tenant='student')
+    yield event_log
+    event_log.close()
+
+
+def homework(name, status, date):
+    return {'homework_name': name, 'status': status, 'date_updated': date}
+
+
+class TestEventLog:
+
+    def test_observe_writes_only_transitions(self, log):
+        log.observe(homework('hw1', 'reviewing', '2023-01-01T10:00:00Z'))
+        log.observe(homework('hw1', 'reviewing', '2023-01-01T10:00:00Z'))
+        log.observe(homework('hw1', 'approved', '2023-01-01T12:00:00Z'))
+        log.observe(homework('hw2', 'reviewing', '2023-01-01T11:00:00Z'))
+        log.observe(homework('hw2', 'rejected', '2023-01-01T11:30:00Z'))
+        columns = load_columns(log.path)
+        assert len(columns['ts']) == 4
+        assert transition_percentiles(
+            columns, 'reviewing', 'approved'
+        ) == {'p50': 2 * HOUR, 'p90': 2 * HOUR, 'p99': 2 * HOUR, 'count': 1}
+        dwell = dwell_by_status(columns)
+        assert dwell['reviewing']['count'] == 2
+        assert dwell['approved'] == {'count': 0}
+        assert 'reviewing -> approved' in report(log.path)
+
+    def test_ts_is_utc(self, log, local_timezone):
+        log.observe(homework('hw1', 'reviewing', '2023-11-14T22:13:20Z'))
+        columns = load_columns(log.path)
+        assert columns['ts'].tolist() == [1700000000], (
+            'Колонка ts хранит unix time date_updated без сдвига '
+            'на часовой пояс хоста.'
+        )
+        hours = throughput_by_hour(columns, utc_offset=3 * HOUR)
+        assert hours[1] == 1, 'Смещение пояса применяется один раз.'
+
+    def test_torn_tail_is_ignored(self, log):
+        log.append([1, 2], [0, 0], [5, 5], [1, 2])
+        log.files['ts'].write(b'\x00' * 8)
+        log.files['ts'].flush()
+        assert len(load_columns(log.path)['ts']) == 2
+
+    def test_reopen_after_torn_tail(self, log):
+        log.append([1, 2], [0, 0], [5, 5], [1, 2])
+        log.files['ts'].write(b'\x00' * 8)
+        log.files['homework'].write(b'\x00' * 3)
+        log.close()
+        reopened = EventLog(log.path)
+        reopened.append([3], [0], [5], [3])
+        reopened.close()
+        columns = load_columns(log.path)
+        assert columns['ts'].tolist() == [1, 2, 3], (
+            'Новая строка должна дописываться после последней полной '
+            'строки, а не после недописанного хвоста.'
+        )
+        assert columns['homework'].tolist() == [5, 5, 5]
+        assert columns['status'].tolist() == [1, 2, 3]
+
+    def test_restart_does_not_repeat_status(self, log):
+        log.observe(homework('hw1', 'reviewing', '2023-01-01T10:00:00Z'))
+        log.close()
+        reopened = EventLog(log.path, tenant='student')
+        reopened.observe(
+            homework('hw1', 'reviewing', '2023-01-01T10:00:00Z')
+        )
+        reopened.observe(homework('hw1', 'approved', '2023-01-01T12:00:00Z'))
+        reopened.close()
+        columns = load_columns(log.path)
+        assert columns['status'].tolist() == [
+            STATUS_CODES['reviewing'], STATUS_CODES['approved']
+        ], 'После перезапуска тот же статус не записывается повторно.'
+
+    def test_million_events_are_fast(self, log):
+        size = 1_000_000
+        rng = np.random.default_rng(1)
+        homeworks = rng.integers(0, size // 2, size, dtype=np.uint64)
+        ts = rng.integers(0, 30 * 24 * HOUR, size)
+        status = rng.integers(1, 4, size)
+        log.append(ts, np.zeros(size), homeworks, status)
+        started = time.monotonic()
+        columns = load_columns(log.path)
+        stats = transition_percentiles(columns, 'reviewing', 'approved')
+        hours = throughput_by_hour(columns, status='approved')
+        elapsed = time.monotonic() - started
+        assert stats['count'] > 0
+        assert hours.sum() == np.count_nonzero(
+            status == STATUS_CODES['approved']
+        )
+        assert elapsed < 2, (
+            'Аналитика по миллиону событий должна занимать доли секунды.'
+        )
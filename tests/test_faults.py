@@ -0,0 +1,94 @@
+import os
+
+import pytest
+import requests
+
+from faults import (
+    FaultProfile, FaultyTransport, PRACTICUM_FAULTS, StatusTimeline,
+    VirtualClock, load_scenarios, run_scenario
+)
+from homework import RETRY_PERIOD
+
+
+class FixedRandom:
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+def make_transport(spec, roll=0.0):
+    clock = VirtualClock()
+    profile = FaultProfile(spec, PRACTICUM_FAULTS, FixedRandom(roll))
+    return clock, FaultyTransport(StatusTimeline(clock), profile, clock)
+
+
+class TestFaultyTransport:
+
+    def test_slow_response_times_out(self):
+        clock, transport = make_transport(
+            {'latency': {'distribution': 'fixed', 'value': 45}}
+        )
+        with pytest.raises(requests.Timeout):
+            transport('url', timeout=30)
+        assert clock() == 30, 'Ожидание должно обрываться по таймауту.'
+
+    def test_truncated_json(self):
+        clock, transport = make_transport({'faults': {'truncated': 1}})
+        with pytest.raises(ValueError):
+            transport('url', timeout=30).json()
+
+    def test_fault_probabilities(self):
+        spec = {'faults': {'reset': 0.2, 'status': 0.3}}
+        _, transport = make_transport(spec, roll=0.1)
+        with pytest.raises(requests.ConnectionError):
+            transport('url')
+        _, transport = make_transport(spec, roll=0.4)
+        assert transport('url').status_code == 503
+        _, transport = make_transport(spec, roll=0.6)
+        assert transport('url').json()['homeworks']
+
+    def test_unknown_fault_is_rejected(self):
+        with pytest.raises(ValueError):
+            make_transport({'faults': {'flood': 1}})
+
+
+class TestScenarios:
+
+    def test_healthy(self):
+        result = run_scenario({'name': 'healthy', 'duration': 0,
+                               'recovery': 7200})
+        assert result.lost == 0
+        assert max(result.delays) <= RETRY_PERIOD
+
+    def test_recovery_after_outage(self):
+        result = run_scenario({
+            'name': 'down', 'duration': 3600, 'recovery': 3600,
+            'practicum': {'faults': {'reset': 1}},
+        })
+        assert result.recovery is not None
+        assert result.recovery <= RETRY_PERIOD, (
+            'Бот должен восстановиться на ближайшем опросе.'
+        )
+        assert result.errors['ResponseException'] > 0
+
+    def test_flood_control_delays_notification(self):
+        result = run_scenario({
+            'name': 'flood', 'duration': 1200, 'recovery': 5400,
+            'telegram': {'faults': {'flood': 1}},
+        })
+        assert result.errors['TelegramSendMessageException'] > 0
+        assert result.lost == 0, (
+            'Уведомление, не отправленное из-за flood control, '
+            'должно уйти после восстановления Telegram.'
+        )
+        assert max(result.delays) >= 1200
+
+
+def test_shipped_scenarios():
+    path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'fault_scenarios.json'
+    )
+    names = [spec['name'] for spec in load_scenarios(path)]
+    assert 'healthy' in names
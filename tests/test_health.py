@@ -0,0 +1,87 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from health import OUTCOME_WINDOW, HealthState, serve, tracked
+
+
+@pytest.fixture
+def state(clock):
+    return HealthState(grace=10, ready_max_age=60, clock=clock)
+
+
+class TestHealthState:
+
+    def test_liveness_follows_heartbeat(self, state, clock):
+        state.heartbeat(600)
+        clock.now += 605
+        assert state.live(), 'Ожидаемая пауза цикла не должна считаться сбоем.'
+        clock.now += 10
+        assert not state.live(), 'Пропущенный heartbeat должен давать сбой.'
+
+    def test_readiness(self, state, clock):
+        api = tracked(lambda item: item, state, 'api', lambda item: 'alice')
+        api(1)
+        assert state.ready()
+        clock.now += 61
+        assert not state.ready(), 'Давний успешный ответ API — не готов.'
+        api(1)
+        assert state.ready()
+        assert state.detail()['tenant_lag'] == {'alice': 0}
+
+    def test_readiness_follows_poll_interval(self, state, clock):
+        api = tracked(lambda item: item, state, 'api')
+        api(1)
+        state.expect('api', 3600)
+        clock.now += 3650
+        assert state.ready(), (
+            'Тихий бот с длинным интервалом опроса остается готов.'
+        )
+        clock.now += 20
+        assert not state.ready()
+        state.expect('api', None)
+        assert state.ready(), 'Узел в резерве без тенантов готов.'
+
+    def test_send_readiness_by_failure_rate(self, state):
+        def broken(item):
+            raise RuntimeError('telegram down')
+
+        tracked(lambda item: item, state, 'api')(1)
+        send = tracked(lambda item: None, state, 'send')
+        for _ in range(9):
+            send(1)
+        with pytest.raises(RuntimeError):
+            tracked(broken, state, 'send')(1)
+        assert state.ready(), (
+            'Одна неудачная отправка одного тенанта не делает '
+            'воркер неготовым.'
+        )
+        for _ in range(OUTCOME_WINDOW):
+            with pytest.raises(RuntimeError):
+                tracked(broken, state, 'send')(1)
+        assert not state.ready()
+        assert state.detail()['checks']['send']['failure_rate'] == 1
+
+
+def test_http_endpoints(state, clock):
+    server = serve(state, 0, host='127.0.0.1')
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urlopen(f'{url}/livez') as response:
+            assert json.load(response) == {'live': True}
+        with urlopen(f'{url}/health') as response:
+            assert 'tenant_lag' in json.load(response)
+        state.register('practicum', lambda: {'concurrency_limit': 4})
+        with urlopen(f'{url}/metrics') as response:
+            assert response.read().decode() == (
+                'homework_bot_concurrency_limit{source="practicum"} 4\n'
+            )
+        clock.now += 1000
+        with pytest.raises(HTTPError) as error:
+            urlopen(f'{url}/readyz')
+        assert error.value.code == 503
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from hedging import HedgeBudget, Hedger, LatencyTracker
+
+
+class FakeResponse:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Первый вызов отвечает медленно, остальные — быстро."""
+
+    def __init__(self, slow=0.5, fail_first=False):
+        self.slow = slow
+        self.fail_first = fail_first
+        self.calls = 0
+        self.responses = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.calls += 1
+            number = self.calls
+        if number == 1:
+            time.sleep(self.slow)
+            if self.fail_first:
+                raise requests.ConnectionError('reset')
+        response = FakeResponse(number)
+        self.responses.append(response)
+        return response
+
+
+def make_hedger(session, credit=1.0):
+    budget = HedgeBudget(ratio=0.05, burst=5)
+    budget.credit = credit
+    return Hedger(budget=budget, max_delay=0.05, session=session, workers=4)
+
+
+class TestHedger:
+
+    def test_fast_response_is_not_hedged(self):
+        session = FakeSession(slow=0)
+        hedger = make_hedger(session)
+        assert hedger.get('url').number == 1
+        assert session.calls == 1
+
+    def test_slow_response_is_hedged(self):
+        session = FakeSession(slow=0.3)
+        hedger = make_hedger(session)
+        started = time.monotonic()
+        response = hedger.get('url')
+        assert response.number == 2, 'Должен победить более быстрый повтор.'
+        assert time.monotonic() - started < 0.3
+        assert hedger.stats['hedge_wins'] == 1
+        time.sleep(0.35)
+        assert session.responses[-1].closed, (
+            'Ответ проигравшего запроса должен закрываться.'
+        )
+
+    def test_hedge_covers_failed_primary(self):
+        session = FakeSession(slow=0.1, fail_first=True)
+        assert make_hedger(session).get('url').number == 2
+
+    def test_queue_wait_does_not_trigger_hedges(self):
+        session = FakeSession(slow=0)
+        hedger = Hedger(
+            budget=HedgeBudget(ratio=1, burst=5), min_delay=0.05,
+            max_delay=0.05, session=session, workers=1
+        )
+        blocker = threading.Event()
+        hedger.executor.submit(blocker.wait)
+        threading.Timer(0.2, blocker.set).start()
+        assert hedger.get('url').number == 1
+        assert hedger.stats['hedges'] == 0, (
+            'Ожидание свободного потока пула не должно '
+            'считаться медленным ответом.'
+        )
+
+    def test_budget_limits_hedges(self):
+        session = FakeSession(slow=0.1)
+        hedger = make_hedger(session, credit=0)
+        assert hedger.get('url').number == 1
+        assert hedger.stats['hedges'] == 0
+
+    def test_hedge_needs_permit(self):
+        session = FakeSession(slow=0.1)
+        budget = HedgeBudget(ratio=0.05, burst=5)
+        budget.credit = 1
+        permits = []
+        hedger = Hedger(
+            budget=budget, max_delay=0.05, session=session, workers=4,
+            permit=lambda kwargs: permits.append(kwargs) and False
+        )
+        assert hedger.get('url', headers={'a': 'b'}).number == 1
+        assert permits == [{'headers': {'a': 'b'}}]
+        assert session.calls == 1, (
+            'Без разрешения ограничителя повтор не отправляется.'
+        )
+
+    def test_budget_ratio(self):
+        budget = HedgeBudget(ratio=0.05, burst=5)
+        spent = 0
+        for _ in range(1000):
+            budget.earn()
+            spent += budget.spend()
+        assert spent == pytest.approx(50, abs=1)
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(size=100)
+    for value in range(200):
+        tracker.add(value)
+    assert len(tracker) == 100
+    assert tracker.percentile(50) == 150
+    assert tracker.percentile(100) == 199
+
+
+def test_hedger_is_built_lazily(monkeypatch):
+    import homework
+    monkeypatch.setattr(homework, 'HEDGER', None)
+    monkeypatch.setattr(homework, 'HEDGE_REQUESTS', '1')
+    hedger = homework.build_hedger()
+    assert isinstance(hedger, Hedger) and homework.HEDGER is hedger
+    assert hedger.executor._max_workers == homework.HEDGE_WORKERS
+    assert homework.build_hedger() is hedger
+    hedger.executor.shutdown()
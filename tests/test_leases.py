@@ -0,0 +1,113 @@
+import pytest
+
+from health import HealthState
+from leases import LeaseCoordinator, SQLiteLeaseStore, partition_of
+from scheduler import TimingWheel
+from tenants import Tenant
+from tracing import Tracer
+from worker import poll_fired
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return SQLiteLeaseStore(str(tmp_path / 'leases.db'), clock=clock)
+
+
+def make_node(store, clock, name):
+    return LeaseCoordinator(
+        store, node_id=name, partitions=8, ttl=10, clock=clock
+    )
+
+
+class FakePipeline:
+
+    def __init__(self):
+        self.items = []
+
+    def put(self, item, span=None):
+        self.items.append(item)
+
+
+class TestLeases:
+
+    def test_acquire_is_exclusive(self, store):
+        assert store.acquire(1, 'a', 10)
+        assert not store.acquire(1, 'b', 10), (
+            'Действующую аренду не должен захватить другой узел.'
+        )
+        assert store.renew(1, 'a', 10)
+        assert not store.renew(1, 'b', 10)
+
+    def test_expired_lease_can_be_taken(self, store, clock):
+        store.acquire(1, 'a', 10)
+        clock.now += 11
+        assert store.acquire(1, 'b', 10)
+        assert not store.renew(1, 'a', 10)
+
+    def test_nodes_split_partitions(self, store, clock):
+        first = make_node(store, clock, 'a')
+        second = make_node(store, clock, 'b')
+        first.heartbeat()
+        assert len(first.owned) == 8
+        second.heartbeat()
+        first.heartbeat()
+        second.heartbeat()
+        assert first.owned.isdisjoint(second.owned)
+        assert first.owned | second.owned == set(range(8))
+        assert len(first.owned) == len(second.owned) == 4
+
+    def test_failover(self, store, clock):
+        first = make_node(store, clock, 'a')
+        second = make_node(store, clock, 'b')
+        for _ in range(2):
+            first.heartbeat()
+            second.heartbeat()
+        clock.now += 11
+        second.heartbeat()
+        assert second.owned == set(range(8)), (
+            'Партиции упавшего узла должны перейти к живому узлу.'
+        )
+        assert not first.owns('tenant')
+
+    def test_owns_tenant_once(self, store, clock):
+        nodes = [make_node(store, clock, name) for name in 'abc']
+        for _ in range(3):
+            for node in nodes:
+                node.heartbeat()
+        for tenant in ('alice', 'bob', 'carol', 'dave'):
+            owners = [node for node in nodes if node.owns(tenant)]
+            assert len(owners) == 1
+            assert partition_of(tenant, 8) in owners[0].owned
+
+    def test_stop_releases(self, store, clock):
+        node = make_node(store, clock, 'a')
+        node.start()
+        node.stop()
+        assert store.leases() == {}
+        assert store.live_nodes() == []
+
+
+def test_worker_polls_only_owned_tenants(store, clock):
+    nodes = [make_node(store, clock, name) for name in 'ab']
+    for _ in range(2):
+        for node in nodes:
+            node.heartbeat()
+    tenants = [
+        Tenant(f'tenant-{number}', 'practicum', 'telegram', number)
+        for number in range(20)
+    ]
+    polled = {}
+    for node in nodes:
+        wheel, pipeline, serving = TimingWheel(), FakePipeline(), {}
+        poll_fired(
+            tenants, wheel, pipeline, Tracer(), HealthState(), node,
+            serving, 0
+        )
+        polled[node.node_id] = {tenant.name for tenant, _ in pipeline.items}
+        assert set(serving) == polled[node.node_id]
+        assert len(wheel) == len(tenants), (
+            'Чужие тенанты остаются в расписании на случай переезда '
+            'партиции.'
+        )
+    assert polled['a'].isdisjoint(polled['b'])
+    assert polled['a'] | polled['b'] == {tenant.name for tenant in tenants}
@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from health import HealthState, render_metrics
+from homework import watch_pipeline
+from pipeline import Pipeline, Stage
+
+
+@pytest.fixture
+def collected():
+    return []
+
+
+class TestPipeline:
+
+    def test_items_pass_all_stages(self, collected):
+        pipeline = Pipeline([
+            Stage('double', lambda item: item * 2, workers=3),
+            Stage('skip_odd', lambda item: item if item % 4 else None),
+            Stage('collect', collected.append),
+        ])
+        pipeline.start()
+        for item in range(10):
+            pipeline.put(item)
+        pipeline.join()
+        pipeline.stop()
+        assert sorted(collected) == [2, 6, 10, 14, 18]
+        assert pipeline.occupancy()['double']['processed'] == 10
+
+    def test_occupancy_is_published(self, collected):
+        pipeline = Pipeline([
+            Stage('fetch', lambda item: item, workers=2, capacity=4),
+            Stage('send', collected.append),
+        ])
+        health = HealthState()
+        watch_pipeline(pipeline, health)
+        pipeline.start()
+        pipeline.put(1)
+        pipeline.join()
+        pipeline.stop()
+        metrics = render_metrics(health.collect())
+        assert 'homework_bot_capacity{source="pipeline_fetch"} 4' in metrics
+        assert 'homework_bot_workers{source="pipeline_fetch"} 2' in metrics
+        assert 'homework_bot_processed{source="pipeline_send"} 1' in (
+            metrics
+        ), 'Загрузка каждой стадии должна попадать в /metrics.'
+
+    def test_errors_are_reported(self):
+        errors = []
+
+        def fail(item):
+            raise ValueError(item)
+
+        pipeline = Pipeline([Stage('fail', fail)], on_error=errors.append)
+        pipeline.start()
+        pipeline.put(1)
+        pipeline.join()
+        pipeline.stop()
+        assert len(errors) == 1 and isinstance(errors[0], ValueError)
+
+    def test_stages_overlap(self, collected):
+        def slow(item):
+            time.sleep(0.05)
+            return item
+
+        pipeline = Pipeline([
+            Stage('fetch', slow, workers=4),
+            Stage('send', lambda item: collected.append(slow(item)),
+                  workers=4),
+        ])
+        pipeline.start()
+        started = time.monotonic()
+        for item in range(8):
+            pipeline.put(item)
+        pipeline.join()
+        elapsed = time.monotonic() - started
+        pipeline.stop()
+        assert len(collected) == 8
+        assert elapsed < 0.05 * 8, (
+            'Стадии должны работать параллельно, а не последовательно.'
+        )
+
+    def test_keyed_stage_keeps_order(self, collected):
+        def send(item):
+            chat, number = item
+            time.sleep(0.01 if number % 2 else 0)
+            collected.append(item)
+
+        pipeline = Pipeline([
+            Stage('send', send, workers=4, key=lambda item: item[0]),
+        ])
+        pipeline.start()
+        for number in range(10):
+            for chat in ('alice', 'bob', 'carol'):
+                pipeline.put((chat, number))
+        pipeline.join()
+        pipeline.stop()
+        for chat in ('alice', 'bob', 'carol'):
+            assert [
+                number for name, number in collected if name == chat
+            ] == list(range(10)), (
+                'Сообщения одного чата должны отправляться по порядку.'
+            )
+        assert pipeline.occupancy()['send']['processed'] == 30
+
+    def test_backpressure(self):
+        release = threading.Event()
+        pipeline = Pipeline([
+            Stage('blocked', lambda item: release.wait(), capacity=1),
+        ])
+        pipeline.start()
+        pipeline.put(1)
+        pipeline.put(2)
+        with pytest.raises(queue.Full):
+            pipeline.put(3, timeout=0.05)
+        assert pipeline.occupancy()['blocked']['busy'] == 1
+        release.set()
+        pipeline.join()
+        pipeline.stop()
@@ -0,0 +1,59 @@
+from polling import MIN_SAMPLES, PollPredictor, parse_date
+
+HOUR = 3600
+
+
+def make_predictor(clock, path=None):
+    return PollPredictor(
+        path, default=600, min_interval=60, max_interval=HOUR, clock=clock
+    )
+
+
+def feed(predictor, status, duration, count, start):
+    for number in range(count):
+        entered = start + number * 7 * 24 * HOUR
+        predictor.record(status, entered, entered + duration)
+
+
+class TestPollPredictor:
+
+    def test_default_without_history(self, clock):
+        predictor = make_predictor(clock)
+        predictor.observe({'homework_name': 'hw', 'status': 'reviewing'})
+        assert predictor.next_delay() == 600
+
+    def test_poll_often_when_change_is_likely(self, clock):
+        predictor = make_predictor(clock)
+        feed(predictor, 'reviewing', 2 * HOUR, MIN_SAMPLES * 2,
+             clock.now - 100 * 7 * 24 * HOUR)
+        predictor.current['hw'] = ('reviewing', clock.now - 1.5 * HOUR)
+        soon = predictor.next_delay()
+        predictor.current['hw'] = ('reviewing', clock.now - 60)
+        later = predictor.next_delay()
+        assert soon < later, (
+            'Опрос должен учащаться, когда смена статуса вероятнее.'
+        )
+        assert 60 <= soon and later <= HOUR
+
+    def test_observe_records_transition(self, clock, tmp_path):
+        path = str(tmp_path / 'history.json')
+        predictor = make_predictor(clock, path)
+        predictor.observe({
+            'homework_name': 'hw', 'status': 'reviewing',
+            'date_updated': '2023-11-14T10:00:00Z'
+        })
+        predictor.observe({
+            'homework_name': 'hw', 'status': 'approved',
+            'date_updated': '2023-11-14T12:00:00Z'
+        })
+        assert predictor.durations == {'reviewing': [2 * HOUR]}
+        restored = make_predictor(clock, path)
+        assert restored.durations == predictor.durations
+        assert restored.current['hw'][0] == 'approved'
+
+
+def test_parse_date_is_utc(local_timezone):
+    assert parse_date('2023-11-14T22:13:20Z', None) == 1700000000, (
+        'date_updated указана в UTC независимо от пояса хоста.'
+    )
+    assert parse_date('bad', 0) == 0
@@ -0,0 +1,92 @@
+import pytest
+
+from homework import hedge_permit
+from ratelimit import (
+    BACKGROUND, INTERACTIVE, MemoryBuckets, RateLimiter, SQLiteBuckets
+)
+from tenants import headers_of
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path, clock):
+    if request.param == 'memory':
+        return MemoryBuckets(clock=clock)
+    return SQLiteBuckets(str(tmp_path / 'buckets.db'), clock=clock)
+
+
+def make_limiter(store, clock, **kwargs):
+    return RateLimiter(store, sleep=clock.sleep, **kwargs)
+
+
+class TestRateLimiter:
+
+    def test_burst_is_smoothed(self, store, clock):
+        limiter = make_limiter(
+            store, clock, rate=2, burst=2, token_rate=100, token_burst=100,
+            reserve=0
+        )
+        started = clock.now
+        for number in range(10):
+            limiter.acquire(f'token-{number}')
+        assert clock.now - started == pytest.approx(4), (
+            'Всплеск должен растягиваться до заданной частоты, а не падать.'
+        )
+
+    def test_per_token_bucket(self, store, clock):
+        limiter = make_limiter(
+            store, clock, rate=100, burst=100, token_rate=1, token_burst=1,
+            reserve=0
+        )
+        limiter.acquire('alice')
+        assert limiter.acquire('bob') == 0
+        assert limiter.acquire('alice') == pytest.approx(1)
+
+    def test_interactive_lane_uses_reserve(self, store, clock):
+        limiter = make_limiter(
+            store, clock, rate=1, burst=3, token_rate=100, token_burst=100,
+            reserve=2
+        )
+        assert limiter.acquire('a', BACKGROUND) == 0
+        assert limiter.acquire('b', INTERACTIVE) == 0
+        assert limiter.acquire('c', INTERACTIVE) == 0
+        assert limiter.acquire('d', BACKGROUND) == pytest.approx(3), (
+            'Фоновый опрос не должен забирать резерв интерактивных запросов.'
+        )
+
+    def test_try_acquire_does_not_wait(self, store, clock):
+        limiter = make_limiter(
+            store, clock, rate=100, burst=100, token_rate=1, token_burst=1,
+            reserve=0
+        )
+        assert limiter.try_acquire('alice')
+        assert not limiter.try_acquire('alice'), (
+            'Без токена в корзине разрешение не выдается.'
+        )
+        assert clock.now == 0, 'try_acquire не должен ждать корзину.'
+        assert limiter.acquire('alice') == pytest.approx(1), (
+            'try_acquire списывает токен из тех же корзин, что и acquire.'
+        )
+
+    def test_hedges_share_token_bucket(self, store, clock):
+        limiter = make_limiter(
+            store, clock, rate=100, burst=100, token_rate=1, token_burst=2,
+            reserve=0
+        )
+        limiter.acquire('alice')
+        assert hedge_permit(limiter, {'headers': headers_of('alice')})
+        assert not hedge_permit(limiter, {'headers': headers_of('alice')}), (
+            'Повтор запроса должен расходовать корзину токена тенанта.'
+        )
+
+    def test_shared_between_instances(self, tmp_path, clock):
+        path = str(tmp_path / 'buckets.db')
+        first = make_limiter(
+            SQLiteBuckets(path, clock=clock), clock, rate=1, burst=1,
+            reserve=0
+        )
+        second = make_limiter(
+            SQLiteBuckets(path, clock=clock), clock, rate=1, burst=1,
+            reserve=0
+        )
+        assert first.acquire('a') == 0
+        assert second.acquire('b') == pytest.approx(1)
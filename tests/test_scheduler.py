@@ -0,0 +1,77 @@
+import random
+import time
+
+import pytest
+
+from scheduler import TimingWheel
+from tests.fixtures.fixture_data import FakeClock
+
+
+@pytest.fixture
+def wheel(clock):
+    return TimingWheel(tick=1, bits=3, levels=3, clock=clock)
+
+
+def run_until(wheel, clock, end, step=1):
+    fired = {}
+    while clock.now < end:
+        clock.now += step
+        for key in wheel.advance():
+            fired[key] = clock.now
+    return fired
+
+
+class TestTimingWheel:
+
+    def test_timers_fire_on_time(self, wheel, clock):
+        rng = random.Random(7)
+        delays = {key: rng.randint(1, 1000) for key in range(500)}
+        for key, delay in delays.items():
+            wheel.schedule(key, delay, key)
+        fired = run_until(wheel, clock, 1100)
+        assert fired == delays, (
+            'Каждый таймер должен сработать ровно в свой тик, '
+            'в том числе после переполнения верхнего уровня.'
+        )
+        assert len(wheel) == 0
+
+    def test_cancel_and_reschedule(self, wheel, clock):
+        wheel.schedule('a', 10, 'a')
+        wheel.schedule('b', 10, 'b')
+        assert wheel.cancel('a')
+        assert not wheel.cancel('a')
+        wheel.schedule('b', 100, 'b')
+        fired = run_until(wheel, clock, 200)
+        assert fired == {'b': 100}
+
+    def test_due(self, wheel, clock):
+        wheel.schedule('a', 10, 'a')
+        clock.now += 3.5
+        assert wheel.due('a') == 6.5
+        assert wheel.due('b') is None
+
+    def test_missed_ticks_are_caught_up(self, wheel, clock):
+        wheel.schedule('a', 5, 'a')
+        wheel.schedule('b', 50, 'b')
+        clock.now = 70.4
+        assert sorted(wheel.advance()) == ['a', 'b']
+        assert wheel.sleep_time() == pytest.approx(0.6)
+        assert wheel.max_lag > 60
+
+    def test_tick_cost_is_flat(self):
+        def measure(count):
+            clock = FakeClock()
+            wheel = TimingWheel(tick=1, clock=clock)
+            for key in range(count):
+                wheel.schedule(key, 600 + key % 600, key)
+            started = time.perf_counter()
+            for _ in range(300):
+                clock.now += 1
+                wheel.advance()
+            return time.perf_counter() - started
+
+        small = measure(1000)
+        large = measure(100000)
+        assert large < small * 20 + 0.05, (
+            'Стоимость пустых тиков не должна расти с числом таймеров.'
+        )
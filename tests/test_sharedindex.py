@@ -0,0 +1,137 @@
+import multiprocessing
+import threading
+import uuid
+
+import pytest
+
+from homework import check_content_message
+from sharedindex import MAX_PROBE, RELEASED, SEQUENCE, SharedStatusIndex
+
+
+@pytest.fixture
+def name():
+    name = f'hw-test-{uuid.uuid4().hex[:12]}'
+    yield name
+    try:
+        SharedStatusIndex(name, slots=8).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def claim_changes(name, keys, results):
+    index = SharedStatusIndex(name)
+    results.put(sum(index.is_new(key, 'approved') for key in keys))
+    index.close()
+
+
+class TestSharedStatusIndex:
+
+    def test_is_new(self, name):
+        index = SharedStatusIndex(name, slots=1024)
+        assert index.is_new(('alice', 'hw.zip'), 'reviewing')
+        assert not index.is_new(('alice', 'hw.zip'), 'reviewing')
+        assert index.is_new(('alice', 'hw.zip'), 'approved')
+        assert index.lookup(('alice', 'hw.zip'))[0] == 2
+        assert index.lookup(('bob', 'hw.zip')) is None
+        index.close()
+
+    def test_processes_share_one_copy(self, name):
+        first = SharedStatusIndex(name, slots=1024)
+        second = SharedStatusIndex(name, slots=4096)
+        assert second.slots == 1024, 'Размер задает создатель сегмента.'
+        assert first.is_new(('alice', 'hw.zip'), 'approved')
+        assert not second.is_new(('alice', 'hw.zip'), 'approved'), (
+            'Другой процесс должен сразу видеть записанный статус.'
+        )
+        first.close()
+        second.close()
+
+    def test_release_returns_change(self, name):
+        first = SharedStatusIndex(name, slots=1024)
+        second = SharedStatusIndex(name)
+        key = ('alice', 'hw.zip')
+        assert first.is_new(key, 'approved')
+        first.release(key, 'approved')
+        assert second.is_new(key, 'approved'), (
+            'После неудачной отправки смену статуса должен '
+            'снова получить один из процессов.'
+        )
+        assert not first.is_new(key, 'approved')
+        second.release(key, 'reviewing')
+        assert not first.is_new(key, 'approved'), (
+            'Чужое значение снимать нельзя.'
+        )
+        first.close()
+        second.close()
+
+    def test_dead_writer_does_not_hang_readers(self, name):
+        index = SharedStatusIndex(name, slots=1024)
+        key = ('alice', 'hw.zip')
+        assert index.is_new(key, 'approved')
+        slot = index._probe(index._key(key))[0]
+        offset = index._offset(slot)
+        sequence = SEQUENCE.unpack_from(index.buf, offset)[0]
+        SEQUENCE.pack_into(index.buf, offset, sequence + 1)
+        found = []
+        reader = threading.Thread(target=lambda: found.append(
+            index.lookup(key)
+        ), daemon=True)
+        reader.start()
+        reader.join(timeout=5)
+        assert found, (
+            'Запись, брошенная умершим писателем, не должна '
+            'блокировать читателей.'
+        )
+        assert found[0][0] == RELEASED
+        assert index.is_new(key, 'approved'), (
+            'Статус из поврежденного слота должен быть выдан повторно.'
+        )
+        index.close()
+
+    def test_full_window_evicts_oldest(self, name):
+        clock = iter(range(1000))
+        index = SharedStatusIndex(
+            name, slots=MAX_PROBE, clock=lambda: next(clock)
+        )
+        for number in range(MAX_PROBE):
+            assert index.is_new(number, 'approved')
+        assert index.is_new('extra', 'approved')
+        assert index.lookup('extra') is not None
+        assert index.lookup(0) is None, 'Вытесняется самая старая запись.'
+        assert index.lookup(1) is not None
+        index.close()
+
+    def test_concurrent_writers_claim_each_change_once(self, name):
+        index = SharedStatusIndex(name)
+        keys = [('tenant', f'hw{number}') for number in range(2000)]
+        for key in keys:
+            index.is_new(key, 'reviewing')
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(
+                target=claim_changes, args=(name, keys, results)
+            )
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        claimed = sum(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join()
+        assert claimed == len(keys), (
+            'Каждую смену статуса должен забрать ровно один процесс.'
+        )
+        assert all(index.lookup(key)[0] == 2 for key in keys)
+        index.close()
+
+
+def test_check_content_message_uses_homework_key(name):
+    index = SharedStatusIndex(name, slots=1024)
+    inner = check_content_message(index)
+    first = {'homework_name': 'a.zip', 'status': 'approved'}
+    second = {'homework_name': 'b.zip', 'status': 'approved'}
+    assert inner('a', key='alice', homework=first).text == 'a'
+    assert inner('b', key='alice', homework=second).text == 'b'
+    assert inner('a', key='alice', homework=first) is None
+    assert inner('a', key='bob', homework=first).text == 'a'
+    index.close()
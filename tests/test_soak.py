@@ -0,0 +1,22 @@
+from soak import OUTCOMES, Sample, check_trends, run
+
+
+def test_soak_is_flat():
+    result = run(cycles=3300, sample_every=150)
+    assert result.cycles == 3300
+    assert set(result.outcomes) == set(OUTCOMES)
+    assert set(result.errors) >= {
+        'StatusCodeError', 'ResponseException',
+        'TelegramSendMessageException', 'TypeError',
+    }, 'Прогон должен пройти через все пути ошибок.'
+    assert [trend.metric for trend in result.trends if not trend.ok] == []
+
+
+def test_trend_detects_leak():
+    samples = [
+        Sample(cycle, 10_000_000 + cycle * 1000, cycle * 100, 10,
+               3 + cycle // 5000, cycle * 0.001)
+        for cycle in range(1000, 21000, 1000)
+    ]
+    failed = {trend.metric for trend in check_trends(samples) if not trend.ok}
+    assert failed == {'rss', 'traced', 'threads'}
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import worker
+from credentials import CredentialReport, INVALID, OK, TenantCheck
+from health import HealthState
+from scheduler import TimingWheel
+from tenants import Tenant, TenantRegistry, load_tenants
+from tests.fixtures.fixture_data import FakeClock
+
+
+def item(name, token='p', period=None):
+    data = {
+        'name': name, 'practicum_token': token,
+        'telegram_token': 'b', 'chat_id': 1,
+    }
+    if period is not None:
+        data['period'] = period
+    return data
+
+
+def write(path, data):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestTenantRegistry:
+
+    def test_directory(self, tmp_path):
+        write(tmp_path / 'a.json', item('a', period=60))
+        write(tmp_path / 'rest.json', [item('b'), item('c')])
+        (tmp_path / 'notes.txt').write_text('не конфигурация')
+        assert [tenant.name for tenant in load_tenants(str(tmp_path))] == [
+            'a', 'b', 'c'
+        ]
+        assert load_tenants(str(tmp_path))[0].period == 60
+
+    def test_duplicate_names(self, tmp_path):
+        write(tmp_path / 'a.json', item('a'))
+        write(tmp_path / 'b.json', item('a'))
+        with pytest.raises(ValueError):
+            load_tenants(str(tmp_path))
+
+    def test_diff(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        write(path, [item('a'), item('b')])
+        registry = TenantRegistry(str(path))
+        assert [tenant.name for tenant in registry.reload().added] == [
+            'a', 'b'
+        ]
+        assert registry.reload() is None, (
+            'Без изменений файла реестр не должен перечитываться.'
+        )
+        write(path, [item('b', token='new'), item('c')])
+        diff = registry.reload()
+        assert [tenant.name for tenant in diff.added] == ['c']
+        assert [tenant.name for tenant in diff.removed] == ['a']
+        assert diff.modified == [Tenant('b', 'new', 'b', '1')]
+
+    def test_broken_config_keeps_tenants(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        write(path, [item('a')])
+        registry = TenantRegistry(str(path))
+        registry.reload()
+        path.write_text('[{"name": ')
+        with pytest.raises(ValueError):
+            registry.reload()
+        assert list(registry.tenants) == ['a']
+
+    @pytest.mark.parametrize('period', [0, -60])
+    def test_invalid_period_keeps_tenants(self, tmp_path, period):
+        path = tmp_path / 'tenants.json'
+        write(path, [item('a', period=60)])
+        registry = TenantRegistry(str(path))
+        registry.reload()
+        write(path, [item('a', period=period)])
+        with pytest.raises(ValueError):
+            registry.reload()
+        assert registry.tenants['a'].period == 60, (
+            'Неположительный интервал опроса не должен применяться.'
+        )
+
+
+def test_changes_apply_to_live_wheel(tmp_path, monkeypatch):
+    checked = threading.Event()
+
+    def validate(tenants, limiter=None):
+        checked.wait(timeout=5)
+        return CredentialReport([
+            TenantCheck(tenant, INVALID if tenant.name == 'bad' else OK, [])
+            for tenant in tenants
+        ])
+
+    monkeypatch.setattr(worker, 'validate_tenants', validate)
+    monkeypatch.setattr(worker.telegram, 'Bot', lambda token: token)
+    path = tmp_path / 'tenants.json'
+    write(path, [item('a'), item('b'), item('c')])
+    registry = TenantRegistry(str(path))
+    checked.set()
+    tenants = worker.start_tenants(registry)
+    checked.clear()
+    clock = FakeClock()
+    wheel = TimingWheel(clock=clock)
+    for tenant in tenants:
+        wheel.schedule(tenant.name, 300, tenant)
+    clock.now = 100
+    bots = {'b': 'b'}
+    health = HealthState()
+    pending = deque()
+
+    write(path, [
+        item('a'), item('b', period=60), item('d'), item('bad')
+    ])
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending.append(
+            worker.reload_tenants(registry, wheel, health, executor)
+        )
+        assert 'c' not in wheel, 'Удаленный тенант снимается с расписания.'
+        assert 'd' not in wheel and not pending[0].done(), (
+            'Проверка новых тенантов не должна блокировать планировщик.'
+        )
+        assert wheel.due('b') == 200, (
+            'До конца проверки тенант опрашивается по старой конфигурации.'
+        )
+        checked.set()
+        pending[0].result(timeout=5)
+        worker.collect_validated(pending, registry, wheel, bots, health)
+    assert not pending
+    assert 'bad' not in wheel, 'Тенант с неверными данными — в карантине.'
+    assert 'd' in wheel
+    assert wheel.due('a') == 200, 'Неизмененный тенант не затрагивается.'
+    assert wheel.due('b') == 60, 'Новый интервал применяется сразу.'
+    assert wheel.timers['b'].payload.period == 60
+
+
+def test_stale_validation_is_skipped(tmp_path):
+    path = tmp_path / 'tenants.json'
+    write(path, [item('a', period=60)])
+    registry = TenantRegistry(str(path))
+    registry.reload()
+    stale = registry.tenants['a']._replace(period=None)
+    report = CredentialReport([TenantCheck(stale, OK, [])])
+    wheel = TimingWheel(clock=FakeClock())
+    worker.schedule_validated(report, registry, wheel, {}, HealthState())
+    assert 'a' not in wheel, (
+        'Результат проверки устаревшей версии тенанта не применяется.'
+    )
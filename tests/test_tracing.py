@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+
+from health import HealthState
+from pipeline import Pipeline, Stage
+from scheduler import TimingWheel
+from tenants import Tenant
+import tracing
+from tracing import (
+    NOOP_SPAN, CollectorExporter, FileExporter, Tracer, current_span
+)
+from worker import poll_fired
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def flush(self):
+        pass
+
+
+class TestTracing:
+
+    def test_disabled_tracer_returns_noop(self):
+        assert Tracer().start_trace('poll') is NOOP_SPAN
+        assert Tracer(ListExporter(), 0).start_trace('poll') is NOOP_SPAN
+
+    def test_pipeline_spans_are_linked(self):
+        exporter = ListExporter()
+        tracer = Tracer(exporter)
+
+        def process(item):
+            current_span().set(homework='hw1')
+            return item
+
+        def fail(item):
+            raise ValueError('boom')
+
+        pipeline = Pipeline(
+            [Stage('fetch', process), Stage('send', fail)],
+            on_error=lambda error: None
+        )
+        pipeline.start()
+        with tracer.start_trace('poll', tenant='student') as root:
+            pipeline.put(1, root)
+            pipeline.join()
+        pipeline.stop()
+        spans = {span['name']: span for span in exporter.spans}
+        assert set(spans) == {'poll', 'fetch', 'send'}
+        assert {span['trace_id'] for span in exporter.spans} == {
+            root.trace_id
+        }
+        assert spans['fetch']['parent_id'] == spans['poll']['span_id']
+        assert spans['fetch']['attributes']['homework'] == 'hw1'
+        assert 'queued' in spans['send']['attributes']
+        assert spans['send']['attributes']['error'] == 'ValueError: boom'
+        assert spans['poll']['attributes'] == {'tenant': 'student'}
+
+    def test_worker_traces_each_tenant(self):
+        exporter = ListExporter()
+        pipeline = Pipeline([Stage('fetch', lambda job: None)])
+        pipeline.start()
+        tenants = [
+            Tenant(name, 'practicum', 'telegram', 1)
+            for name in ('alice', 'bob')
+        ]
+        poll_fired(
+            tenants, TimingWheel(), pipeline, Tracer(exporter),
+            HealthState(), None, {}, 0
+        )
+        pipeline.join()
+        pipeline.stop()
+        roots = {
+            span['attributes']['tenant']: span for span in exporter.spans
+            if span['name'] == 'poll'
+        }
+        assert set(roots) == {'alice', 'bob'}, (
+            'Воркер должен открывать трассу poll на опрос тенанта.'
+        )
+        parents = {
+            span['parent_id'] for span in exporter.spans
+            if span['name'] == 'fetch'
+        }
+        assert parents == {root['span_id'] for root in roots.values()}
+
+    def test_file_exporter(self, tmp_path):
+        path = tmp_path / 'trace.jsonl'
+        tracer = Tracer(FileExporter(str(path)))
+        with tracer.start_trace('poll') as root:
+            with root.child('fetch'):
+                pass
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line['name'] for line in lines] == ['fetch', 'poll']
+
+
+def test_slow_collector_does_not_block_export(monkeypatch):
+    released = threading.Event()
+    batches = []
+
+    def post(url, json, timeout):
+        released.wait(timeout=5)
+        batches.append(json['spans'])
+
+    monkeypatch.setattr(tracing.requests, 'post', post)
+    exporter = CollectorExporter('http://collector', batch=2, capacity=4)
+    started = time.monotonic()
+    for number in range(20):
+        exporter.export({'number': number})
+    assert time.monotonic() - started < 0.5, (
+        'Медленный коллектор не должен задерживать стадии конвейера.'
+    )
+    assert exporter.dropped > 0, 'При заполненной очереди спаны отбрасываются.'
+    released.set()
+    exporter.flush()
+    sent = [span['number'] for batch in batches for span in batch]
+    assert sent[:2] == [0, 1]
+    assert len(sent) + exporter.dropped == 20
@@ -0,0 +1,39 @@
+import pytest
+
+from validation import EMPTY_RESULT, validate_response
+
+STATUSES = {'approved': '', 'reviewing': '', 'rejected': ''}
+
+
+class TestValidateResponse:
+
+    def test_empty_homeworks_is_fast_path(self):
+        result = validate_response(
+            {'homeworks': [], 'current_date': 1}, STATUSES
+        )
+        assert result is EMPTY_RESULT, (
+            'Пустой список работ не должен считаться ошибкой.'
+        )
+        assert result.empty
+
+    @pytest.mark.parametrize('response', [
+        [], {'current_date': 1}, {'homeworks': {}}
+    ])
+    def test_invalid_envelope(self, response):
+        with pytest.raises(TypeError):
+            validate_response(response, STATUSES)
+
+    def test_bad_records_are_isolated(self):
+        good = {'homework_name': 'hw2', 'status': 'approved'}
+        response = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'unknown'},
+                good,
+                {'status': 'reviewing'},
+                'hw3',
+            ]
+        }
+        result = validate_response(response, STATUSES)
+        assert result.valid == [good]
+        assert len(result.rejected) == 3
+        assert not result.empty
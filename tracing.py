@@ -0,0 +1,229 @@
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH: int = 100
+EXPORT_QUEUE: int = 10_000
+EXPORT_INTERVAL: float = 5.0
+
+current = contextvars.ContextVar('current_span', default=None)
+
+
+def new_id(bits=64) -> str:
+    """Возвращает случайный идентификатор в шестнадцатеричном виде."""
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+class NoopSpan:
+    """
+    Пустой спан.
+    Используется, когда трассировка выключена или трасса
+    не попала в выборку. Все методы ничего не делают.
+    """
+
+    def child(self, name, **attributes):
+        """Возвращает сам себя."""
+        return self
+
+    def set(self, **attributes) -> None:
+        """Ничего не делает."""
+
+    def finish(self) -> None:
+        """Ничего не делает."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    """Отрезок работы внутри трассы с родительской связью."""
+
+    def __init__(self, tracer, name, trace_id, parent_id=None,
+                 attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_id()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.end = None
+        self.token = None
+
+    def child(self, name, **attributes):
+        """Открывает дочерний спан."""
+        return Span(
+            self.tracer, name, self.trace_id, self.span_id, attributes
+        )
+
+    def set(self, **attributes) -> None:
+        """Добавляет атрибуты спана."""
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        """Закрывает спан и передает его экспортеру."""
+        if self.end is not None:
+            return
+        self.end = time.time()
+        self.tracer.export(self)
+
+    def to_dict(self) -> dict:
+        """Возвращает спан в виде словаря для экспорта."""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration': self.end - self.start,
+            'attributes': self.attributes,
+        }
+
+    def __enter__(self):
+        self.token = current.set(self)
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        if error is not None:
+            self.set(error=f'{error_type.__name__}: {error}')
+        current.reset(self.token)
+        self.finish()
+        return False
+
+
+def current_span():
+    """Возвращает активный спан текущего потока или пустой спан."""
+    return current.get() or NOOP_SPAN
+
+
+class Tracer:
+    """
+    Создает трассы с заданной долей выборки.
+    Без экспортера трассировка выключена и start_trace
+    возвращает NOOP_SPAN, не выделяя памяти.
+    """
+
+    def __init__(self, exporter=None, sample_rate=1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_trace(self, name, **attributes):
+        """Открывает корневой спан трассы, если она попала в выборку."""
+        if self.exporter is None or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, name, new_id(128), attributes=attributes)
+
+    def export(self, span) -> None:
+        """Передает закрытый спан экспортеру."""
+        try:
+            self.exporter.export(span.to_dict())
+        except Exception as error:
+            logger.error(f'Не удалось экспортировать спан: {error}')
+
+    def close(self) -> None:
+        """Сбрасывает накопленные спаны."""
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+class FileExporter:
+    """Пишет спаны в файл, по одному JSON-объекту на строку."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, span) -> None:
+        """Дописывает спан в файл."""
+        line = json.dumps(span, ensure_ascii=False)
+        with self.lock, open(self.path, 'a', encoding='utf-8') as file:
+            file.write(line + os.linesep)
+
+    def flush(self) -> None:
+        """Файл пишется сразу, сбрасывать нечего."""
+
+
+class CollectorExporter:
+    """
+    Отправляет спаны пачками на HTTP-коллектор из фонового потока.
+    export только кладет спан в ограниченную очередь, поэтому медленный
+    коллектор не задерживает стадии конвейера. Если очередь заполнена,
+    спан отбрасывается и учитывается в dropped. Неполная пачка
+    отправляется, когда новых спанов нет дольше interval секунд.
+    """
+
+    def __init__(self, url, batch=EXPORT_BATCH, timeout=5,
+                 capacity=EXPORT_QUEUE, interval=EXPORT_INTERVAL):
+        self.url = url
+        self.batch = batch
+        self.timeout = timeout
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=capacity)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self._run, name='trace-export', daemon=True
+        )
+        self.thread.start()
+
+    def export(self, span) -> None:
+        """Ставит спан в очередь отправки, не дожидаясь коллектора."""
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def flush(self) -> None:
+        """Отправляет накопленные спаны, ожидая не дольше timeout."""
+        sent = threading.Event()
+        try:
+            self.queue.put(sent, timeout=self.timeout)
+        except queue.Full:
+            return
+        sent.wait(self.timeout)
+        if self.dropped:
+            logger.warning(
+                f'Отброшено спанов при заполненной очереди: {self.dropped}'
+            )
+
+    def _run(self) -> None:
+        spans = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.interval)
+            except queue.Empty:
+                item = None
+            flushed = isinstance(item, threading.Event)
+            if item is not None and not flushed:
+                spans.append(item)
+                if len(spans) < self.batch:
+                    continue
+            if spans:
+                self._send(spans)
+                spans = []
+            if flushed:
+                item.set()
+
+    def _send(self, spans) -> None:
+        try:
+            requests.post(
+                self.url, json={'spans': spans}, timeout=self.timeout
+            )
+        except requests.RequestException as error:
+            logger.error(f'Коллектор трасс недоступен: {error}')
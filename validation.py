@@ -0,0 +1,46 @@
+from collections import namedtuple
+
+ValidationResult = namedtuple(
+    'ValidationResult', ('valid', 'rejected', 'empty')
+)
+EMPTY_RESULT = ValidationResult((), (), True)
+
+
+def record_error(homework, statuses):
+    """
+    Проверяет одну запись о домашней работе.
+    Возвращает текст причины отказа или None, если запись корректна.
+    """
+    if not isinstance(homework, dict):
+        return 'Ожидаемый тип данных для домашней работы: dict'
+    if homework.get('homework_name') is None:
+        return 'В ответе отсутствует ключ homework_name'
+    if homework.get('status') not in statuses:
+        return 'Получен неизвестный статус домашней работы'
+    return None
+
+
+def validate_response(response, statuses) -> ValidationResult:
+    """
+    Проверяет ответ API и все записи в нем за один проход.
+    Ошибки конверта ответа приводят к TypeError, а некорректные
+    записи не мешают остальным и попадают в rejected вместе с причиной.
+    Пустой список работ — штатная ситуация, для него возвращается
+    заранее подготовленный EMPTY_RESULT.
+    """
+    if not isinstance(response, dict):
+        raise TypeError('Ожидаемый тип данных для response: dict')
+    homeworks = response.get('homeworks')
+    if not isinstance(homeworks, list):
+        raise TypeError('Ожидаемый тип данных для homeworks: list')
+    if not homeworks:
+        return EMPTY_RESULT
+    valid = []
+    rejected = []
+    for homework in homeworks:
+        reason = record_error(homework, statuses)
+        if reason is None:
+            valid.append(homework)
+        else:
+            rejected.append((homework, reason))
+    return ValidationResult(valid, rejected, False)
@@ -0,0 +1,355 @@
+import logging
+import os
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import telegram
+
+from alerts import ErrorAggregator, telegram_notifier
+from credentials import validate_tenants
+from health import tracked
+from homework import (
+    FETCH_MAX_CONCURRENCY, OPERATOR_CHAT_ID, PIPELINE_CAPACITY,
+    PRACTICUM_TOKEN, RETRY_PERIOD, SEND_MAX_CONCURRENCY, TELEGRAM_CHAT_ID,
+    TELEGRAM_TOKEN, TENANT_NAME, bounded_upstreams, build_dedupe,
+    build_coordinator, build_health, build_hedger, build_limiter,
+    build_limits, build_tracer,
+    check_content_message, deliver, process_response, report_error,
+    request_statuses, send_notification, watch_pipeline
+)
+from pipeline import Pipeline, Stage
+from ratelimit import limited
+from scheduler import TimingWheel
+from tenants import Tenant, TenantRegistry, headers_of
+
+logger = logging.getLogger(__name__)
+
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+
+RELOAD_INTERVAL: int = 5
+RELOAD = object()
+
+
+def load_all_tenants(registry=None) -> list:
+    """
+    Возвращает тенантов из реестра TENANTS_FILE.
+    Без файла воркер обслуживает одного тенанта из переменных окружения.
+    """
+    if registry is not None:
+        registry.reload()
+        return list(registry.tenants.values())
+    return [
+        Tenant(TENANT_NAME, PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
+    ]
+
+
+def fetch(job):
+    """Стадия запроса: получает статусы работ тенанта."""
+    tenant, timestamp = job
+    return tenant, request_statuses(
+        headers_of(tenant.practicum_token), timestamp
+    )
+
+
+def process(job, message_content, aggregator):
+    """Стадия обработки: готовит сообщение тенанту о новом статусе."""
+    tenant, response = job
+    message = process_response(
+        response, partial(message_content, key=tenant.name), aggregator
+    )
+    if message is None:
+        return None
+    return tenant, message
+
+
+def send(job, bots):
+    """Стадия отправки: отправляет сообщение в чат тенанта."""
+    tenant, notification = job
+    send_notification(
+        partial(deliver, bots[tenant.telegram_token], tenant.chat_id),
+        notification
+    )
+
+
+def tenant_name(job) -> str:
+    """Возвращает имя тенанта задания конвейера."""
+    return job[0].name
+
+
+def practicum_token(job) -> str:
+    """Возвращает токен Практикума тенанта задания конвейера."""
+    return job[0].practicum_token
+
+
+def chat_of(job):
+    """Возвращает чат задания стадии отправки."""
+    return job[0].chat_id
+
+
+def build_worker_pipeline(bots, aggregator, health, limiter,
+                          limits) -> Pipeline:
+    """
+    Собирает конвейер запрос -> обработка -> отправка для тенантов.
+    Уведомления одного чата отправляет один поток, в порядке
+    поступления.
+    """
+    fetch_stage, send_stage = bounded_upstreams(
+        fetch, partial(send, bots=bots), limits
+    )
+    return Pipeline(
+        [
+            Stage(
+                'fetch',
+                tracked(
+                    limited(fetch_stage, limiter, practicum_token),
+                    health, 'api', tenant_name
+                ),
+                workers=FETCH_MAX_CONCURRENCY, capacity=PIPELINE_CAPACITY
+            ),
+            Stage(
+                'process',
+                partial(
+                    process,
+                    message_content=check_content_message(build_dedupe()),
+                    aggregator=aggregator
+                ),
+                capacity=PIPELINE_CAPACITY
+            ),
+            Stage(
+                'send', tracked(send_stage, health, 'send'),
+                workers=SEND_MAX_CONCURRENCY, capacity=PIPELINE_CAPACITY,
+                key=chat_of
+            ),
+        ],
+        on_error=partial(report_error, aggregator=aggregator)
+    )
+
+
+def start_tenants(registry=None, limiter=None) -> list:
+    """
+    Стартовая фаза: проверяет учетные данные всех тенантов.
+    Тенанты с неверными данными уходят в карантин, работа
+    прекращается, только если не осталось ни одного тенанта.
+    Пробные запросы к API Практикума проходят через limiter.
+    """
+    tenants = validate_tenants(
+        load_all_tenants(registry), limiter=limiter
+    ).valid
+    if not tenants:
+        message = 'Нет тенантов с корректными учетными данными.'
+        logger.critical(message)
+        sys.exit(message)
+    return tenants
+
+
+def period_of(tenant) -> int:
+    """Возвращает интервал опроса тенанта."""
+    return tenant.period or RETRY_PERIOD
+
+
+def first_delay(tenant) -> int:
+    """
+    Возвращает задержку первого опроса тенанта.
+    Опросы равномерно распределяются по интервалу опроса,
+    чтобы тысячи тенантов не опрашивались одновременно.
+    """
+    return zlib.crc32(tenant.name.encode()) % period_of(tenant)
+
+
+def owned(coordinator, tenant) -> bool:
+    """
+    Проверяет, что тенанта опрашивает этот узел.
+    Без LEASE_DB координации нет, и узел опрашивает всех тенантов.
+    """
+    return coordinator is None or coordinator.owns(tenant.name)
+
+
+def poll_fired(fired, wheel, pipeline, tracer, health, coordinator,
+               serving, timestamp) -> None:
+    """
+    Ставит сработавших тенантов на следующий опрос и передает
+    в конвейер тех, кого опрашивает этот узел. serving хранит
+    интервалы опроса тенантов узла.
+    Опрос тенанта открывает трассу poll: корневой спан закрывается
+    после постановки в очередь, спаны стадий дописываются к нему
+    по мере прохождения конвейера.
+    """
+    for tenant in fired:
+        if tenant is RELOAD:
+            continue
+        wheel.schedule(tenant.name, period_of(tenant), tenant)
+        if not owned(coordinator, tenant):
+            serving.pop(tenant.name, None)
+            continue
+        serving[tenant.name] = period_of(tenant)
+        health.expect('api', period_of(tenant))
+        with tracer.start_trace('poll', tenant=tenant.name) as span:
+            pipeline.put((tenant, timestamp), span)
+
+
+def apply_changes(diff, wheel, health, executor, limiter=None):
+    """
+    Применяет изменения реестра тенантов к работающему планировщику.
+    Удаленные тенанты сразу снимаются с расписания. Новые и измененные
+    проверяются в executor, чтобы сетевые проверки не останавливали
+    цикл планировщика; до конца проверки измененный тенант опрашивается
+    по старой конфигурации. Возвращает future с CredentialReport.
+    Остальных тенантов изменения не затрагивают.
+    """
+    for tenant in diff.removed:
+        wheel.cancel(tenant.name)
+        health.forget(tenant.name)
+    logger.info(
+        f'Конфигурация тенантов обновлена: добавлено {len(diff.added)}, '
+        f'удалено {len(diff.removed)}, изменено {len(diff.modified)}'
+    )
+    return executor.submit(
+        validate_tenants, diff.added + diff.modified, limiter=limiter
+    )
+
+
+def schedule_validated(report, registry, wheel, bots, health) -> None:
+    """
+    Ставит в расписание тенантов, прошедших проверку, и снимает
+    тенантов из карантина. Измененный тенант сохраняет срок
+    ближайшего опроса, если он не дальше нового интервала.
+    Тенанты, которых реестр успел изменить или удалить, пропускаются:
+    их учтет проверка следующего изменения.
+    """
+    for check in report.quarantined:
+        if registry.tenants.get(check.tenant.name) == check.tenant:
+            wheel.cancel(check.tenant.name)
+            health.forget(check.tenant.name)
+    for tenant in report.valid:
+        if registry.tenants.get(tenant.name) != tenant:
+            continue
+        if tenant.telegram_token not in bots:
+            bots[tenant.telegram_token] = telegram.Bot(
+                token=tenant.telegram_token
+            )
+        due = wheel.due(tenant.name)
+        delay = (
+            first_delay(tenant) if due is None
+            else min(due, period_of(tenant))
+        )
+        wheel.schedule(tenant.name, delay, tenant)
+
+
+def reload_tenants(registry, wheel, health, executor, limiter=None):
+    """
+    Перечитывает реестр тенантов и применяет изменения.
+    Возвращает future проверки новых тенантов или None.
+    """
+    try:
+        diff = registry.reload()
+    except (OSError, ValueError, TypeError, KeyError) as error:
+        logger.error(f'Конфигурация тенантов не применена: {error}')
+        return None
+    if diff is None or not any(diff):
+        return None
+    return apply_changes(diff, wheel, health, executor, limiter)
+
+
+def collect_validated(pending, registry, wheel, bots, health) -> None:
+    """
+    Применяет завершенные проверки тенантов в порядке изменений.
+    Незавершенные проверки остаются в pending до следующего тика.
+    """
+    while pending and pending[0].done():
+        try:
+            report = pending.popleft().result()
+        except Exception as error:
+            logger.error(f'Проверка новых тенантов не выполнена: {error}')
+            continue
+        schedule_validated(report, registry, wheel, bots, health)
+
+
+def main():
+    """
+    Опрашивает API для всех тенантов воркера.
+    Каждые RELOAD_INTERVAL секунд реестр TENANTS_FILE проверяется
+    на изменения, которые применяются без перезапуска.
+    При заданном LEASE_DB опрашиваются только тенанты партиций,
+    арендованных узлом; остальные остаются в расписании и
+    опрашиваются, как только узел заберет их партицию.
+    """
+    registry = TenantRegistry(TENANTS_FILE) if TENANTS_FILE else None
+    limiter = build_limiter()
+    tenants = start_tenants(registry, limiter)
+    bots = {
+        token: telegram.Bot(token=token)
+        for token in {tenant.telegram_token for tenant in tenants}
+    }
+    operator_bot = bots.get(TELEGRAM_TOKEN) or next(iter(bots.values()))
+    aggregator = ErrorAggregator(telegram_notifier(
+        operator_bot, OPERATOR_CHAT_ID or TELEGRAM_CHAT_ID
+    ))
+    health = build_health()
+    build_hedger(limiter)
+    pipeline = build_worker_pipeline(
+        bots, aggregator, health, limiter, build_limits(health)
+    )
+    watch_pipeline(pipeline, health)
+    pipeline.start()
+    coordinator = build_coordinator()
+    tracer = build_tracer()
+    timestamp = int(time.time())
+    wheel = TimingWheel()
+    for tenant in tenants:
+        wheel.schedule(tenant.name, first_delay(tenant), tenant)
+    serving = {
+        tenant.name: period_of(tenant) for tenant in tenants
+        if owned(coordinator, tenant)
+    }
+    health.expect('api', max(serving.values(), default=None))
+    # Один поток проверки: изменения применяются в порядке поступления.
+    validator = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='tenants'
+    )
+    pending = deque()
+    if registry is not None:
+        wheel.schedule(RELOAD, RELOAD_INTERVAL, RELOAD)
+
+    try:
+        while True:
+            fired = wheel.advance()
+            poll_fired(
+                fired, wheel, pipeline, tracer, health, coordinator,
+                serving, timestamp
+            )
+            if RELOAD in fired:
+                future = reload_tenants(
+                    registry, wheel, health, validator, limiter
+                )
+                if future is not None:
+                    pending.append(future)
+                wheel.schedule(RELOAD, RELOAD_INTERVAL, RELOAD)
+                serving = {
+                    name: period for name, period in serving.items()
+                    if name in wheel
+                }
+            collect_validated(pending, registry, wheel, bots, health)
+            if not serving:
+                health.expect('api', None)
+            aggregator.flush()
+            health.heartbeat(wheel.sleep_time())
+            time.sleep(wheel.sleep_time())
+    finally:
+        validator.shutdown(wait=False, cancel_futures=True)
+        pipeline.stop()
+        tracer.close()
+        if coordinator is not None:
+            coordinator.stop()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.DEBUG,
+        filename='worker.log',
+        format='%(asctime)s, %(levelname)s, %(message)s'
+    )
+    main()